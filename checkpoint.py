@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Append-only NDJSON checkpoints of structured questions, for resumable runs.
+"""
+
+import os
+from pathlib import Path
+from typing import IO, Dict, Optional
+
+import orjson
+
+
+def checkpoint_source(pdf_path: Path, **settings) -> dict:
+    """
+    Describe what a run's results are made from: the PDF and the settings given.
+    
+    The PDF is identified by its resolved path, size and modification time,
+    so replacing or editing it no longer matches an older checkpoint.
+    """
+    stat = pdf_path.stat()
+    return {
+        'pdf': str(pdf_path.resolve()),
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        **settings,
+    }
+
+
+def checkpoint_matches(checkpoint_path: Path, source: dict) -> bool:
+    """
+    Whether results in the checkpoint were made from source.
+    
+    A missing or empty checkpoint matches anything; one without a source
+    header line, written before headers existed, matches nothing.
+    """
+    if not checkpoint_path.exists() or not checkpoint_path.stat().st_size:
+        return True
+    
+    with open(checkpoint_path, 'rb') as f:
+        try:
+            header = orjson.loads(f.readline())
+        except orjson.JSONDecodeError:
+            return False
+    return isinstance(header, dict) and header.get('source') == source
+
+
+def load_checkpoint(checkpoint_path: Path, key: str = 'questionNumber') -> Dict[int, dict]:
+    """
+    Load results saved by earlier runs, keyed by their `key` field.
+    
+    A line cut short by a crash mid-write, or one without the key, is skipped.
+    """
+    results = {}
+    if not checkpoint_path.exists():
+        return results
+    
+    with open(checkpoint_path, 'rb') as f:
+        for line in f:
+            try:
+                result = orjson.loads(line)
+            except orjson.JSONDecodeError:
+                continue
+            if key in result:
+                results[result[key]] = result
+    return results
+
+
+def open_checkpoint(checkpoint_path: Path, source: Optional[dict] = None) -> IO[bytes]:
+    """
+    Open the checkpoint for appending, ending any line cut short by a crash.
+    
+    A new checkpoint starts with a header line recording source, for
+    checkpoint_matches to compare against on the next run.
+    """
+    if checkpoint_path.exists() and checkpoint_path.stat().st_size:
+        with open(checkpoint_path, 'rb+') as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b'\n':
+                f.write(b'\n')
+        return open(checkpoint_path, 'ab')
+    
+    checkpoint = open(checkpoint_path, 'ab')
+    if source is not None:
+        append_checkpoint(checkpoint, {'source': source})
+    return checkpoint
+
+
+def append_checkpoint(checkpoint: IO[bytes], result: dict):
+    """Append one result as a JSON line and flush it to disk."""
+    checkpoint.write(orjson.dumps(result) + b'\n')
+    checkpoint.flush()
+    os.fsync(checkpoint.fileno())
@@ -4,16 +4,14 @@ Configuration module for NEET Question Extractor.
 Loads settings from environment variables using python-dotenv.
 """
 
+import functools
 import os
 import re
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional, Pattern
 
-from dotenv import load_dotenv
-
-# Load environment variables from .env file
-load_dotenv()
+from jsonschema import Draft7Validator
 
 
 @dataclass(frozen=True)
@@ -29,6 +27,10 @@ class ModelConfig:
     rate_limit_delay: float
     error_delay: float
     max_retries: int
+    concurrency: int
+    tokens_per_minute: int
+    split_model: bool
+    distractor_model_name: str
     
     def __post_init__(self):
         if not self.api_key:
@@ -48,6 +50,7 @@ class PathConfig:
     logs_dir: Path
     progress_file: Path
     failed_log: Path
+    cache_file: Path
     
     def ensure_directories(self):
         """Create necessary directories if they don't exist."""
@@ -91,6 +94,37 @@ SECTION_END_PATTERNS = [
     re.compile(r'SECTION.*B', re.I),
 ]
 
+
+_env_loaded = False
+
+
+def _load_env_once() -> None:
+    """Load environment variables from .env file on first use, not at import."""
+    global _env_loaded
+    if not _env_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _env_loaded = True
+
+
+def _combine_patterns(patterns: List[Pattern]) -> Pattern:
+    """Merge a pattern group into one alternation so each text is scanned once."""
+    return re.compile('|'.join(f'(?:{p.pattern})' for p in patterns), re.I)
+
+
+# Single-pass equivalents of the pattern groups above
+INVALID_RE = _combine_patterns(INVALID_PATTERNS)
+
+# re has no fast literal search under IGNORECASE. For ASCII text, matching
+# the lowercased text against the lowercased patterns finds the same hits
+# several times faster. (The patterns hold no escapes that lowercasing changes.)
+INVALID_LOWER_RE = re.compile('|'.join(f'(?:{p.pattern.lower()})' for p in INVALID_PATTERNS))
+SECTION_END_RE = _combine_patterns(SECTION_END_PATTERNS)
+
+# Every start pattern requires the word PHYSICS, so matching it alone is
+# equivalent and lets the engine run a plain literal search
+SECTION_START_RE = re.compile(r'PHYSICS', re.I)
+
 # Enhanced regex patterns for NEET question extraction
 # Matches: "123. Question text here"
 QUESTION_PATTERN = re.compile(
@@ -106,18 +140,23 @@ OPTION_PATTERN = re.compile(
 
 # Placeholder patterns to detect in validation
 PLACEHOLDER_PATTERNS = [
-    r'placeholder',
-    r'text\s+here',
-    r'option\s+[A-D]\s+text',
-    r'sample.*question',
-    r'analysis\s+not\s+provided',
-    r'chapter\s+name\s+here',
-    r'topic\s+name\s+here',
+    re.compile(r'placeholder', re.I),
+    re.compile(r'text\s+here', re.I),
+    re.compile(r'option\s+[A-D]\s+text', re.I),
+    re.compile(r'sample.*question', re.I),
+    re.compile(r'analysis\s+not\s+provided', re.I),
+    re.compile(r'chapter\s+name\s+here', re.I),
+    re.compile(r'topic\s+name\s+here', re.I),
 ]
 
+# Single-pass check for any placeholder pattern
+PLACEHOLDER_RE = _combine_patterns(PLACEHOLDER_PATTERNS)
 
+
+@functools.lru_cache(maxsize=1)
 def get_model_config() -> ModelConfig:
-    """Load model configuration from environment variables."""
+    """Load model configuration from environment variables (cached after first call)."""
+    _load_env_once()
     return ModelConfig(
         api_key=os.getenv('ANTHROPIC_API_KEY', ''),
         base_url=os.getenv('ANTHROPIC_BASE_URL', 'https://api.anthropic.com'),
@@ -128,14 +167,31 @@ def get_model_config() -> ModelConfig:
         rate_limit_delay=float(os.getenv('RATE_LIMIT_DELAY', '1.0')),
         error_delay=float(os.getenv('ERROR_DELAY', '5.0')),
         max_retries=int(os.getenv('MAX_RETRIES', '5')),
+        concurrency=int(os.getenv('MAX_CONCURRENCY', '5')),
+        tokens_per_minute=int(os.getenv('TOKENS_PER_MINUTE', '0')),
+        # Opt-in: a cheaper model writes the incorrect-option analyses
+        split_model=os.getenv('SPLIT_MODEL', 'false').lower() in ('1', 'true', 'yes'),
+        distractor_model_name=os.getenv('CLAUDE_DISTRACTOR_MODEL', 'claude-3-haiku-20240307'),
     )
 
 
+def get_log_level() -> str:
+    """Load logging level name from environment variables."""
+    _load_env_once()
+    return os.getenv('LOG_LEVEL', 'INFO').upper()
+
+
+@functools.lru_cache(maxsize=None)
 def get_path_config(
     pdf_path: Optional[str] = None,
     output_path: Optional[str] = None
 ) -> PathConfig:
-    """Load path configuration with optional overrides."""
+    """
+    Load path configuration with optional overrides.
+    
+    Cached per (pdf_path, output_path), so directories are created only once.
+    """
+    _load_env_once()
     base_dir = Path(__file__).parent
     
     default_pdf = Path("/home/harish/Desktop/neet-learning-platform/NEET_2024_Physics.pdf")
@@ -146,8 +202,9 @@ def get_path_config(
         output_path=Path(output_path) if output_path else Path(os.getenv('OUTPUT_PATH', str(default_output))),
         batches_dir=base_dir / "batches",
         logs_dir=base_dir / "logs",
-        progress_file=base_dir / "processing_progress.json",
+        progress_file=base_dir / "processing_progress.jsonl",
         failed_log=base_dir / "failed_questions.log",
+        cache_file=base_dir / "response_cache.sqlite3",
     )
     
     config.ensure_directories()
@@ -252,3 +309,9 @@ NEET_DB_SCHEMA = {
     },
     "required": ["metadata", "questions"]
 }
+
+# Compiled once and shared, instead of rebuilding the validator per dataset
+NEET_DB_VALIDATOR = Draft7Validator(NEET_DB_SCHEMA)
+
+# Validates one question on its own, for checks made while streaming
+NEET_QUESTION_VALIDATOR = Draft7Validator(NEET_DB_SCHEMA['properties']['questions']['items'])
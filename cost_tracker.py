@@ -3,11 +3,12 @@
 Cost tracking module for monitoring API usage and expenses.
 """
 
+import threading
 from dataclasses import dataclass, field
 from typing import Dict
 
 
-@dataclass
+@dataclass(slots=True)
 class CostTracker:
     """Track API calls and token usage for cost estimation."""
     
@@ -16,6 +17,9 @@ class CostTracker:
     output_tokens: int = 0
     successful_calls: int = 0
     failed_calls: int = 0
+    cache_creation_tokens: int = 0
+    cache_read_tokens: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
     
     # Perplexity pricing (as of 2025)
     # Input: ~$1 per 1M tokens
@@ -23,32 +27,49 @@ class CostTracker:
     INPUT_COST_PER_TOKEN: float = 1.0 / 1_000_000
     OUTPUT_COST_PER_TOKEN: float = 5.0 / 1_000_000
     
+    # Prompt caching: writes cost 1.25x input price, reads 0.1x
+    CACHE_WRITE_MULTIPLIER: float = 1.25
+    CACHE_READ_MULTIPLIER: float = 0.1
+    
     def record_call(
         self,
         input_tokens: int,
         output_tokens: int,
-        success: bool = True
+        success: bool = True,
+        cache_creation_tokens: int = 0,
+        cache_read_tokens: int = 0
     ) -> None:
         """
         Record an API call with token counts.
         
         Args:
-            input_tokens: Number of input (prompt) tokens
+            input_tokens: Number of uncached input (prompt) tokens
             output_tokens: Number of output (completion) tokens
             success: Whether the call was successful
+            cache_creation_tokens: Prompt tokens written to the prompt cache
+            cache_read_tokens: Prompt tokens served from the prompt cache
         """
-        self.total_calls += 1
-        self.input_tokens += input_tokens
-        self.output_tokens += output_tokens
-        
-        if success:
-            self.successful_calls += 1
-        else:
-            self.failed_calls += 1
+        # Calls may be recorded from several worker threads at once
+        with self._lock:
+            self.total_calls += 1
+            self.input_tokens += input_tokens
+            self.output_tokens += output_tokens
+            self.cache_creation_tokens += cache_creation_tokens
+            self.cache_read_tokens += cache_read_tokens
+            
+            if success:
+                self.successful_calls += 1
+            else:
+                self.failed_calls += 1
     
     def estimate_input_cost(self) -> float:
-        """Calculate estimated cost for input tokens."""
-        return self.input_tokens * self.INPUT_COST_PER_TOKEN
+        """Calculate estimated cost for input tokens, including cache writes and reads."""
+        billed_tokens = (
+            self.input_tokens
+            + self.cache_creation_tokens * self.CACHE_WRITE_MULTIPLIER
+            + self.cache_read_tokens * self.CACHE_READ_MULTIPLIER
+        )
+        return billed_tokens * self.INPUT_COST_PER_TOKEN
     
     def estimate_output_cost(self) -> float:
         """Calculate estimated cost for output tokens."""
@@ -76,6 +97,8 @@ class CostTracker:
             'failed_calls': self.failed_calls,
             'input_tokens': self.input_tokens,
             'output_tokens': self.output_tokens,
+            'cache_creation_tokens': self.cache_creation_tokens,
+            'cache_read_tokens': self.cache_read_tokens,
             'total_tokens': self.input_tokens + self.output_tokens,
             'estimated_cost_usd': round(self.estimate_cost(), 4),
             'input_cost_usd': round(self.estimate_input_cost(), 4),
@@ -95,6 +118,9 @@ class CostTracker:
         print(f"\nToken Usage:")
         print(f"  Input tokens:      {summary['input_tokens']:,}")
         print(f"  Output tokens:     {summary['output_tokens']:,}")
+        if summary['cache_creation_tokens'] or summary['cache_read_tokens']:
+            print(f"  Cache writes:      {summary['cache_creation_tokens']:,}")
+            print(f"  Cache reads:       {summary['cache_read_tokens']:,}")
         print(f"  Total tokens:      {summary['total_tokens']:,}")
         print(f"\nCost Estimate:")
         print(f"  Input cost:        ${summary['input_cost_usd']:.4f}")
@@ -114,7 +140,8 @@ class CostTracker:
     def estimate_tokens_from_text(text: str) -> int:
         """
         Rough estimation of tokens from text.
-        Uses word count * 1.3 as approximation.
+        Uses ~4 characters per token as approximation, which avoids
+        splitting the whole text just to count words.
         
         Args:
             text: Input text
@@ -122,5 +149,4 @@ class CostTracker:
         Returns:
             Estimated token count
         """
-        words = len(text.split())
-        return int(words * 1.3)
+        return len(text) >> 2
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Locate JSON objects embedded in free-form model output.
+"""
+
+import re
+from typing import Iterator
+
+
+# Characters that change JSON nesting or string state
+_JSON_TOKEN_RE = re.compile(r'[{}"\\]')
+
+
+def iter_json_objects(text: str) -> Iterator[str]:
+    """
+    Yield each top-level balanced {...} region of text, in order.
+    
+    Single pass over the structural characters only; braces inside string
+    literals (and escaped quotes) are skipped, so code fences, prose and
+    stray braces around the JSON need no separate handling.
+    """
+    depth = 0
+    start = 0
+    in_string = False
+    escaped_at = -1
+    
+    for token in _JSON_TOKEN_RE.finditer(text):
+        pos = token.start()
+        if pos == escaped_at:
+            continue
+        
+        ch = token.group()
+        if in_string:
+            if ch == '\\':
+                escaped_at = pos + 1
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            # Quotes in prose outside an object don't start a string
+            in_string = depth > 0
+        elif ch == '{':
+            if depth == 0:
+                start = pos
+            depth += 1
+        elif ch == '}' and depth:
+            depth -= 1
+            if depth == 0:
+                yield text[start:pos + 1]
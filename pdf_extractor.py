@@ -4,42 +4,111 @@ PDF extraction module for NEET Question Extractor.
 Extracts Physics section and parses questions with options.
 """
 
+import functools
+import logging
+import os
 import re
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Tuple, Dict, Optional
-
-import fitz  # PyMuPDF
+from typing import TYPE_CHECKING, Iterator, List, Tuple, Dict, Optional, Union
 
 from config import (
-    SECTION_START_PATTERNS,
-    SECTION_END_PATTERNS,
+    SECTION_START_RE,
+    SECTION_END_RE,
     QUESTION_PATTERN,
     OPTION_PATTERN
 )
 from question_validator import is_valid_physics_question
 
+if TYPE_CHECKING:
+    import fitz  # PyMuPDF - imported lazily where used, it is slow to load
+
+
+logger = logging.getLogger(__name__)
+
+# Marks where the actual Physics questions begin (after the instructions)
+_PHYSICS_HEADER_RE = re.compile(r'PHYSICS\s*\n', re.IGNORECASE)
+
+# Question format: NUMBER. QUESTION_TEXT (1) OPT1 (2) OPT2 (3) OPT3 (4) OPT4 Answer (X)
+# Scanned by _iter_physics_qa: the number line is found with a regex, then each
+# field runs up to the first occurrence of the next marker via str.find.
+_QA_START_RE = re.compile(r'(\d+)\.\s*\n')
+_QA_MARKERS = ('(1)', '(2)', '(3)', '(4)')
+_QA_ANSWER_RE = re.compile(r'Answer\s*\((\d)\)')
+_LEADING_WS_RE = re.compile(r'\s*')
+
+# Option letters, indexed by PDF option number - 1
+_LETTERS = ('A', 'B', 'C', 'D')
+
+# Single-pass character fixes applied by normalize_text
+_NORMALIZE_TABLE = str.maketrans({'ﬁ': 'fi', 'ﬂ': 'fl', '（': '(', '）': ')'})
+_WS_RE = re.compile(r'[ \t]+')
+
+# Below this many pages, worker start-up costs more than it saves
+_PARALLEL_MIN_PAGES = 8
+_PAGES_PER_CHUNK = 4
+
+# Only the top strip of a page is read when looking for section headers
+_HEADER_CLIP_HEIGHT = 120
+_HEADER_MAX_CHARS = 500
+
+
+@dataclass(slots=True)
+class Question:
+    """A parsed question with its options and the answer printed in the PDF."""
+    
+    number: int
+    question_text: str
+    options: Dict[str, str]
+    correct_index: Optional[int]
+    correct_answer: Optional[str]
+    has_answer: bool
+    full_text: str = ''
+
 
-def extract_text_from_pdf(pdf_path: Path) -> List[str]:
+@dataclass(frozen=True)
+class PhysicsSection:
+    """Page texts of the Physics section and where it sits in the PDF."""
+    
+    total_pages: int
+    start_page: int
+    end_page: int
+    pages: Tuple[str, ...]
+
+
+def _cache_key(pdf_path: Path) -> Tuple[str, int, int]:
+    """Build a (path, mtime_ns, size) key so an edited PDF is re-read."""
+    if not pdf_path.exists():
+        raise FileNotFoundError(f"PDF not found: {pdf_path}")
+    
+    stat = pdf_path.stat()
+    return str(pdf_path.resolve()), stat.st_mtime_ns, stat.st_size
+
+
+@functools.lru_cache(maxsize=8)
+def _extract_pages_cached(path_str: str, mtime_ns: int, size: int) -> Tuple[str, ...]:
+    """Extract page texts once per file version."""
+    with PdfSession(Path(path_str)) as session:
+        return tuple(session.pages())
+
+
+def extract_text_from_pdf(pdf_path: Union[Path, 'PdfSession']) -> List[str]:
     """
     Extract text from each page of PDF.
     
+    Results are cached per file, so repeated calls within a run
+    don't re-parse the PDF.
+    
     Args:
-        pdf_path: Path to PDF file
+        pdf_path: Path to PDF file, or an open PdfSession to reuse
         
     Returns:
         List of text strings, one per page
     """
-    if not pdf_path.exists():
-        raise FileNotFoundError(f"PDF not found: {pdf_path}")
-    
-    pages = []
-    with fitz.open(pdf_path) as doc:
-        for page_num, page in enumerate(doc):
-            text = page.get_text()
-            # Keep original formatting - don't normalize too aggressively
-            pages.append(text)
-    
-    return pages
+    if isinstance(pdf_path, PdfSession):
+        return list(pdf_path.pages())
+    return list(_extract_pages_cached(*_cache_key(pdf_path)))
 
 
 def find_section_bounds(pages: List[str]) -> Tuple[int, int]:
@@ -57,11 +126,8 @@ def find_section_bounds(pages: List[str]) -> Tuple[int, int]:
     
     # Find Physics section start
     for i, page_text in enumerate(pages):
-        for pattern in SECTION_START_PATTERNS:
-            if pattern.search(page_text):
-                start_page = i
-                break
-        if start_page >= 0:
+        if SECTION_START_RE.search(page_text):
+            start_page = i
             break
     
     if start_page < 0:
@@ -70,25 +136,178 @@ def find_section_bounds(pages: List[str]) -> Tuple[int, int]:
     
     # Find Physics section end (where Chemistry/Biology starts)
     for i in range(start_page + 1, len(pages)):
-        for pattern in SECTION_END_PATTERNS:
-            if pattern.search(pages[i]):
-                end_page = i
-                break
-        if end_page < len(pages):
+        if SECTION_END_RE.search(pages[i]):
+            end_page = i
             break
     
     return start_page, end_page
 
 
+def iter_page_headers(doc: 'fitz.Document') -> Iterator[str]:
+    """
+    Yield the header strip of each page, enough to spot section titles.
+    
+    Clipping to the top of the page makes this pass much cheaper than
+    extracting the full text of every page.
+    """
+    import fitz
+    
+    for page in doc:
+        clip = fitz.Rect(0, 0, page.rect.width, _HEADER_CLIP_HEIGHT)
+        yield page.get_text("text", clip=clip)[:_HEADER_MAX_CHARS]
+
+
+def _extract_page_chunk(chunk: Tuple[str, int, int]) -> List[str]:
+    """Worker: open the PDF and extract text of pages [start, end)."""
+    import fitz
+    
+    path_str, start, end = chunk
+    with fitz.open(path_str) as doc:
+        return [doc[i].get_text() for i in range(start, end)]
+
+
+def extract_pages_range(doc: 'fitz.Document', start: int, end: int) -> List[str]:
+    """
+    Extract full text of pages [start, end) from an open document.
+    
+    Large ranges are split into chunks extracted by worker processes, each
+    opening its own copy of the file - PyMuPDF documents cannot be shared
+    across threads and text extraction holds the GIL.
+    """
+    chunks = [
+        (doc.name, i, min(i + _PAGES_PER_CHUNK, end))
+        for i in range(start, end, _PAGES_PER_CHUNK)
+    ]
+    workers = min(os.cpu_count() or 1, len(chunks))
+    
+    if end - start < _PARALLEL_MIN_PAGES or workers < 2 or not doc.name:
+        return [doc[i].get_text() for i in range(start, end)]
+    
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return [text for texts in executor.map(_extract_page_chunk, chunks) for text in texts]
+
+
+class PdfSession:
+    """
+    A PDF opened once and shared by every extraction step.
+    
+    Page text and the Physics section are computed on first use and kept,
+    so later steps reuse them instead of reopening and re-parsing the file.
+    
+    Usage:
+        with PdfSession(pdf_path) as session:
+            pages = extract_text_from_pdf(session)
+            questions = extract_physics_questions_improved(session)
+    """
+    
+    def __init__(self, pdf_path: Path):
+        import fitz
+        
+        self.path = Path(pdf_path)
+        self.doc = fitz.open(self.path)
+        self._pages: Optional[List[str]] = None
+        self._section: Optional[PhysicsSection] = None
+    
+    def __enter__(self) -> 'PdfSession':
+        return self
+    
+    def __exit__(self, *exc) -> None:
+        self.close()
+    
+    def __str__(self) -> str:
+        return str(self.path)
+    
+    def close(self) -> None:
+        """Close the underlying document."""
+        self.doc.close()
+    
+    def pages(self) -> List[str]:
+        """Full text of every page."""
+        if self._pages is None:
+            # Keep original formatting - don't normalize too aggressively
+            self._pages = extract_pages_range(self.doc, 0, self.doc.page_count)
+        return self._pages
+    
+    def physics_section(self) -> PhysicsSection:
+        """Bounds and page texts of the Physics section."""
+        if self._section is None:
+            start_page, end_page = find_section_bounds(list(iter_page_headers(self.doc)))
+            if self._pages is not None:
+                pages = self._pages[start_page:end_page]
+            else:
+                pages = extract_pages_range(self.doc, start_page, end_page)
+            self._section = PhysicsSection(self.doc.page_count, start_page, end_page, tuple(pages))
+        return self._section
+
+
+@functools.lru_cache(maxsize=8)
+def _extract_section_cached(path_str: str, mtime_ns: int, size: int) -> PhysicsSection:
+    """Locate and extract the Physics section once per file version."""
+    with PdfSession(Path(path_str)) as session:
+        return session.physics_section()
+
+
+def extract_physics_section(pdf_path: Union[Path, PdfSession]) -> PhysicsSection:
+    """
+    Extract only the pages of the Physics section.
+    
+    Section bounds come from a cheap pass over page headers; full text is
+    then extracted just for the pages inside the section.
+    
+    Args:
+        pdf_path: Path to PDF file, or an open PdfSession to reuse
+        
+    Returns:
+        PhysicsSection with page count, bounds and section page texts
+    """
+    if isinstance(pdf_path, PdfSession):
+        return pdf_path.physics_section()
+    return _extract_section_cached(*_cache_key(pdf_path))
+
+
+def _iter_physics_qa(text: str) -> Iterator[Tuple[str, ...]]:
+    """
+    Yield (number, question, opt1, opt2, opt3, opt4, answer) field tuples.
+    
+    A single forward scan: no field may contain the marker that ends it, so
+    a block either completes or fails at once without backtracking.
+    """
+    pos = 0
+    while True:
+        start = _QA_START_RE.search(text, pos)
+        if start is None:
+            return
+        
+        fields = [start.group(1)]
+        cur = start.end()
+        for marker in _QA_MARKERS:
+            idx = text.find(marker, cur)
+            if idx < 0:
+                # No later block can complete either
+                return
+            fields.append(text[cur:idx])
+            cur = _LEADING_WS_RE.match(text, idx + len(marker)).end()
+        
+        idx = text.find('Answer', cur)
+        if idx < 0:
+            return
+        answer = _QA_ANSWER_RE.match(text, idx)
+        if answer is None:
+            # Malformed answer line - retry from the next possible number
+            pos = start.start() + 1
+            continue
+        
+        fields.append(text[cur:idx])
+        fields.append(answer.group(1))
+        yield tuple(fields)
+        pos = answer.end()
+
+
 def normalize_text(text: str) -> str:
     """Normalize text for better parsing."""
-    # Fix common OCR issues
-    text = text.replace('ﬁ', 'fi').replace('ﬂ', 'fl')
-    # Normalize parentheses
-    text = text.replace('（', '(').replace('）', ')')
-    # Only normalize horizontal whitespace, preserve newlines
-    text = re.sub(r'[ \t]+', ' ', text)
-    return text
+    # Fix common OCR ligatures and full-width parentheses in one pass,
+    # then normalize only horizontal whitespace, preserving newlines
+    return _WS_RE.sub(' ', text.translate(_NORMALIZE_TABLE))
 
 
 def parse_options(text: str) -> List[Dict[str, str]]:
@@ -122,57 +341,39 @@ def parse_options(text: str) -> List[Dict[str, str]]:
     return options[:4]
 
 
-def extract_physics_questions_improved(pdf_path: Path) -> List[Dict]:
+def iter_physics_questions_improved(pdf_path: Union[Path, PdfSession]) -> Iterator[Question]:
     """
-    Extract Physics questions from PDF with correct answers.
+    Yield Physics questions from PDF with correct answers as they are parsed.
     
     Args:
-        pdf_path: Path to NEET PDF
+        pdf_path: Path to NEET PDF, or an open PdfSession to reuse
         
-    Returns:
-        List of question dicts with number, text, options, and correct_answer
+    Yields:
+        Question records with number, text, options, and correct_answer
     """
     print(f"📄 Reading PDF: {pdf_path}")
-    pages = extract_text_from_pdf(pdf_path)
+    section = extract_physics_section(pdf_path)
     
-    print(f"📑 Total pages: {len(pages)}")
-    start_page, end_page = find_section_bounds(pages)
-    print(f"🔍 Physics section: pages {start_page+1} to {end_page}")
+    print(f"📑 Total pages: {section.total_pages}")
+    print(f"🔍 Physics section: pages {section.start_page+1} to {section.end_page}")
     
     # Extract Physics section only
-    physics_pages = pages[start_page:end_page]
-    physics_text = '\n'.join(physics_pages)
+    physics_text = '\n'.join(section.pages)
     physics_text = normalize_text(physics_text)
     
     # Find where actual PHYSICS questions start (after instructions)
-    physics_start_match = re.search(r'PHYSICS\s*\n', physics_text, re.IGNORECASE)
+    physics_start_match = _PHYSICS_HEADER_RE.search(physics_text)
     if physics_start_match:
         physics_text = physics_text[physics_start_match.end():]
     
     print(f"📝 Extracting questions from {len(physics_text)} characters...")
     
-    questions = []
-    
-    # Enhanced pattern that captures: NUMBER. QUESTION_TEXT (1) OPT1 (2) OPT2 (3) OPT3 (4) OPT4 Answer (X)
-    pattern = re.compile(
-        r'(\d+)\.\s*\n'  # Question number with newline
-        r'(.*?)'  # Question text (non-greedy)
-        r'\(1\)\s*(.*?)'  # Option 1
-        r'\(2\)\s*(.*?)'  # Option 2  
-        r'\(3\)\s*(.*?)'  # Option 3
-        r'\(4\)\s*(.*?)'  # Option 4
-        r'Answer\s*\((\d)\)',  # Answer
-        re.DOTALL
-    )
-    
-    # Map option numbers to letters
-    num_to_letter = {'1': 'A', '2': 'B', '3': 'C', '4': 'D'}
+    extracted = 0
+    skipped = 0
     
-    matches = pattern.findall(physics_text)
-    
-    for match in matches:
+    for fields in _iter_physics_qa(physics_text):
         try:
-            q_num, q_text, opt1, opt2, opt3, opt4, answer_idx = match
+            q_num, q_text, opt1, opt2, opt3, opt4, answer_idx = fields
             
             number = int(q_num)
             
@@ -185,52 +386,65 @@ def extract_physics_questions_improved(pdf_path: Path) -> List[Dict]:
             
             # Skip if question too short
             if len(q_text) < 20:
-                print(f"  ⏭️  Skipping Q{number}: Question too short")
+                logger.debug("  ⏭️  Skipping Q%d: Question too short", number)
+                skipped += 1
                 continue
             
             # Map answer to letter
             correct_index = int(answer_idx)
-            correct_answer = num_to_letter.get(answer_idx)
             
-            if not correct_answer:
-                print(f"  ⚠️  Q{number}: Invalid answer index {answer_idx}")
+            if not 1 <= correct_index <= 4:
+                logger.warning("  ⚠️  Q%d: Invalid answer index %s", number, answer_idx)
+                skipped += 1
                 continue
             
-            options_dict = {
-                'A': opt1,
-                'B': opt2,
-                'C': opt3,
-                'D': opt4
-            }
+            correct_answer = _LETTERS[correct_index - 1]
+            options_dict = dict(zip(_LETTERS, (opt1, opt2, opt3, opt4)))
             
-            questions.append({
-                'number': number,
-                'text': q_text,  # Full text
-                'question_text': q_text,  # Clean question
-                'options': options_dict,
-                'correct_index': correct_index,
-                'correct_answer': correct_answer,
-                'has_answer': True
-            })
+            extracted += 1
+            yield Question(
+                number=number,
+                question_text=q_text,
+                options=options_dict,
+                correct_index=correct_index,
+                correct_answer=correct_answer,
+                has_answer=True,
+                full_text=q_text,
+            )
             
-            print(f"  ✅ Q{number}: Answer ({correct_index}) → {correct_answer}")
+            logger.debug("  ✅ Q%d: Answer (%d) → %s", number, correct_index, correct_answer)
             
         except (ValueError, AttributeError) as e:
-            print(f"  ⚠️  Error parsing question: {e}")
+            logger.warning("  ⚠️  Error parsing question: %s", e)
+            skipped += 1
             continue
     
-    print(f"✅ Extracted {len(questions)} valid Physics questions")
-    with_answers = sum(1 for q in questions if q.get('has_answer'))
-    print(f"✅ {with_answers} questions have answers from PDF")
-    return questions
+    print(f"✅ Extracted {extracted} valid Physics questions")
+    if skipped:
+        print(f"⏭️  Skipped {skipped} question blocks (LOG_LEVEL=DEBUG for details)")
+    # Every question from this pattern carries its answer
+    print(f"✅ {extracted} questions have answers from PDF")
+
+
+def extract_physics_questions_improved(pdf_path: Union[Path, PdfSession]) -> List[Question]:
+    """
+    Extract Physics questions from PDF with correct answers.
+    
+    Args:
+        pdf_path: Path to NEET PDF, or an open PdfSession to reuse
+        
+    Returns:
+        List of Question records with number, text, options, and correct_answer
+    """
+    return list(iter_physics_questions_improved(pdf_path))
 
 
-def extract_questions_simple(pdf_path: Path, max_questions: Optional[int] = None) -> List[Dict]:
+def extract_questions_simple(pdf_path: Union[Path, PdfSession], max_questions: Optional[int] = None) -> List[Dict]:
     """
     Simplified extraction for testing - extracts all questions without filtering.
     
     Args:
-        pdf_path: Path to PDF
+        pdf_path: Path to PDF, or an open PdfSession to reuse
         max_questions: Maximum number to extract (None for all)
         
     Returns:
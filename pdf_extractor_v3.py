@@ -4,83 +4,85 @@ Enhanced PDF extraction module for NEET Question Extractor.
 Extracts Physics section, questions with options, AND correct answers from PDF.
 """
 
+import logging
 import re
 from pathlib import Path
-from typing import List, Tuple, Dict, Optional
+from typing import Iterator, List, Tuple, Union
 
-import fitz  # PyMuPDF
+# Page extraction, section detection and text cleanup are shared with
+# pdf_extractor; this module only adds the block-by-block answer parsing
+from pdf_extractor import (
+    PdfSession,
+    Question,
+    extract_physics_section,
+    normalize_text,
+)
+from pdf_extractor import extract_text_from_pdf as _extract_raw_pages
+
+
+logger = logging.getLogger(__name__)
+
+# Any whitespace run, including newlines
+_WS_ANY_RE = re.compile(r'\s+')
+
+# Runs of spaces and tabs within a line
+_WS_INLINE_RE = re.compile(r'[ \t]+')
+
+# Option letters, indexed by PDF option number - 1
+_LETTERS = ('A', 'B', 'C', 'D')
+
+# Question number -> question text -> options (1)-(4) -> Answer (X)
+_QUESTION_BLOCK_RE = re.compile(
+    r'(\d+)\.\s*'  # Question number
+    r'(.*?)'  # Question text (non-greedy)
+    r'(?=\(\d\)|\nAnswer|\n\d+\.|\Z)',  # Stop at options or answer or next question
+    re.DOTALL
+)
+
+# Option pattern: (1) text, (2) text, etc.
+_OPTION_RE = re.compile(
+    r'\(([1-4])\)\s*([^\(]*?)(?=\s*\([1-4]\)|Answer|Sol\.|$)',
+    re.DOTALL
+)
 
-from config import (
-    SECTION_START_PATTERNS,
-    SECTION_END_PATTERNS,
+# Answer pattern: Answer (X) where X is 1-4
+_ANSWER_RE = re.compile(
+    r'Answer\s*\((\d)\)',
+    re.IGNORECASE
 )
 
 
-def extract_text_from_pdf(pdf_path: Path) -> List[str]:
+def extract_text_from_pdf(pdf_path: Union[Path, PdfSession]) -> List[str]:
     """
     Extract text from each page of PDF.
     
+    Shares the cached page extraction of pdf_extractor, so running both
+    extractors on the same PDF parses it only once.
+    
     Args:
-        pdf_path: Path to PDF file
+        pdf_path: Path to PDF file, or an open PdfSession to reuse
         
     Returns:
         List of text strings, one per page
     """
-    if not pdf_path.exists():
-        raise FileNotFoundError(f"PDF not found: {pdf_path}")
-    
-    pages = []
-    with fitz.open(pdf_path) as doc:
-        for page_num, page in enumerate(doc):
-            text = page.get_text()
-            # Normalize whitespace
-            text = re.sub(r'[ \t]+', ' ', text)
-            pages.append(text)
-    
-    return pages
+    # Normalize whitespace
+    return [_WS_INLINE_RE.sub(' ', text) for text in _extract_raw_pages(pdf_path)]
 
 
-def find_section_bounds(pages: List[str]) -> Tuple[int, int]:
-    """
-    Find start and end page indices for Physics section.
-    
-    Args:
-        pages: List of page texts
-        
-    Returns:
-        Tuple of (start_page, end_page) indices (inclusive)
-    """
-    start_page = -1
-    end_page = len(pages)
-    
-    # Find Physics section start
-    for i, page_text in enumerate(pages):
-        for pattern in SECTION_START_PATTERNS:
-            if pattern.search(page_text):
-                start_page = i
-                break
-        if start_page >= 0:
-            break
-    
-    if start_page < 0:
-        # Fallback: assume Physics starts early
-        start_page = 0
-    
-    # Find Physics section end (where Chemistry/Biology starts)
-    for i in range(start_page + 1, len(pages)):
-        for pattern in SECTION_END_PATTERNS:
-            if pattern.search(pages[i]):
-                end_page = i
-                break
-        if end_page < len(pages):
-            break
-    
-    return start_page, end_page
+def _iter_question_blocks(text: str) -> Iterator[Tuple[re.Match, str]]:
+    """Yield each question match with its block text, up to the next question."""
+    matches = _QUESTION_BLOCK_RE.finditer(text)
+    match = next(matches, None)
+    while match is not None:
+        next_match = next(matches, None)
+        end = next_match.start() if next_match else len(text)
+        yield match, text[match.start():end]
+        match = next_match
 
 
-def extract_physics_questions_with_answers(pdf_path: Path) -> List[Dict]:
+def iter_physics_questions_with_answers(pdf_path: Union[Path, PdfSession]) -> Iterator[Question]:
     """
-    Extract Physics questions from PDF WITH correct answers.
+    Yield Physics questions from PDF WITH correct answers as they are parsed.
     
     This is the enhanced version that extracts:
     - Question number
@@ -89,58 +91,27 @@ def extract_physics_questions_with_answers(pdf_path: Path) -> List[Dict]:
     - Correct answer from "Answer (X)" line
     
     Args:
-        pdf_path: Path to NEET PDF
+        pdf_path: Path to NEET PDF, or an open PdfSession to reuse
         
-    Returns:
-        List of question dicts with number, text, options, and correct_answer
+    Yields:
+        Question records with number, text, options, and correct_answer
     """
     print(f"📄 Reading PDF: {pdf_path}")
-    pages = extract_text_from_pdf(pdf_path)
+    section = extract_physics_section(pdf_path)
     
-    print(f"📑 Total pages: {len(pages)}")
-    start_page, end_page = find_section_bounds(pages)
-    print(f"🔍 Physics section: pages {start_page+1} to {end_page}")
+    print(f"📑 Total pages: {section.total_pages}")
+    print(f"🔍 Physics section: pages {section.start_page+1} to {section.end_page}")
     
     # Extract Physics section only
-    physics_pages = pages[start_page:end_page]
-    physics_text = '\n'.join(physics_pages)
-    
-    # Normalize text
-    physics_text = physics_text.replace('ﬁ', 'fi').replace('ﬂ', 'fl')
-    physics_text = physics_text.replace('（', '(').replace('）', ')')
+    physics_text = normalize_text('\n'.join(section.pages))
     
     print(f"📝 Extracting questions from {len(physics_text)} characters...")
     
-    questions = []
-    
-    # Enhanced regex to capture question blocks with answers
-    # Pattern: Question number -> question text -> options (1)-(4) -> Answer (X)
-    question_block_pattern = re.compile(
-        r'(\d+)\.\s*'  # Question number
-        r'(.*?)'  # Question text (non-greedy)
-        r'(?=\(\d\)|\nAnswer|\n\d+\.|\Z)',  # Stop at options or answer or next question
-        re.DOTALL
-    )
-    
-    # Option pattern: (1) text, (2) text, etc.
-    option_pattern = re.compile(
-        r'\(([1-4])\)\s*([^\(]*?)(?=\s*\([1-4]\)|Answer|Sol\.|$)',
-        re.DOTALL
-    )
-    
-    # Answer pattern: Answer (X) where X is 1-4
-    answer_pattern = re.compile(
-        r'Answer\s*\((\d)\)',
-        re.IGNORECASE
-    )
-    
-    # Map option numbers to letters
-    num_to_letter = {'1': 'A', '2': 'B', '3': 'C', '4': 'D'}
+    extracted = 0
+    with_answers = 0
+    skipped = 0
     
-    # Find all question blocks
-    matches = list(question_block_pattern.finditer(physics_text))
-    
-    for i, match in enumerate(matches):
+    for match, block_text in _iter_question_blocks(physics_text):
         try:
             number = int(match.group(1))
             full_block = match.group(2).strip()
@@ -149,67 +120,71 @@ def extract_physics_questions_with_answers(pdf_path: Path) -> List[Dict]:
             if len(full_block) < 20:
                 continue
             
-            # Find the end of this question block (start of next question or end of text)
-            if i < len(matches) - 1:
-                next_start = matches[i + 1].start()
-                block_text = physics_text[match.start():next_start]
-            else:
-                block_text = physics_text[match.start():]
+            # Collapse newlines and extra whitespace once for the whole block
+            block_text = _WS_ANY_RE.sub(' ', block_text)
             
             # Extract options
-            option_matches = option_pattern.findall(block_text)
+            option_matches = _OPTION_RE.findall(block_text)
             options_dict = {}
             
             for opt_num, opt_text in option_matches:
-                opt_text = opt_text.strip()
-                # Remove newlines and extra whitespace
-                opt_text = ' '.join(opt_text.split())
-                if opt_num in num_to_letter:
-                    options_dict[num_to_letter[opt_num]] = opt_text
+                options_dict[_LETTERS[int(opt_num) - 1]] = opt_text.strip()
             
             # Must have exactly 4 options
             if len(options_dict) != 4:
-                print(f"  ⚠️  Q{number}: Found {len(options_dict)} options, skipping")
+                logger.debug("  ⚠️  Q%d: Found %d options, skipping", number, len(options_dict))
+                skipped += 1
                 continue
             
-            # Extract question text (remove options from it)
-            question_text = full_block
-            for opt_match in option_pattern.finditer(full_block):
-                question_text = question_text.replace(opt_match.group(0), '')
-            question_text = question_text.strip()
-            question_text = ' '.join(question_text.split())  # Normalize whitespace
+            # Extract question text (remove options from it, normalize whitespace)
+            question_text = ' '.join(_OPTION_RE.sub('', full_block).split())
             
             # Extract correct answer
-            answer_match = answer_pattern.search(block_text)
+            answer_match = _ANSWER_RE.search(block_text)
             correct_answer = None
             correct_index = None
             
             if answer_match:
                 correct_index = int(answer_match.group(1))
                 if 1 <= correct_index <= 4:
-                    correct_answer = num_to_letter[str(correct_index)]
-                    print(f"  ✅ Q{number}: Answer ({correct_index}) → {correct_answer}")
+                    correct_answer = _LETTERS[correct_index - 1]
+                    logger.debug("  ✅ Q%d: Answer (%d) → %s", number, correct_index, correct_answer)
                 else:
-                    print(f"  ⚠️  Q{number}: Invalid answer index {correct_index}")
+                    logger.warning("  ⚠️  Q%d: Invalid answer index %d", number, correct_index)
             else:
-                print(f"  ⚠️  Q{number}: No answer found in PDF")
+                logger.warning("  ⚠️  Q%d: No answer found in PDF", number)
             
-            questions.append({
-                'number': number,
-                'question_text': question_text,
-                'options': options_dict,
-                'correct_index': correct_index,
-                'correct_answer': correct_answer,
-                'full_text': full_block,
-                'has_answer': correct_answer is not None
-            })
+            extracted += 1
+            with_answers += correct_answer is not None
+            yield Question(
+                number=number,
+                question_text=question_text,
+                options=options_dict,
+                correct_index=correct_index,
+                correct_answer=correct_answer,
+                has_answer=correct_answer is not None,
+                full_text=full_block,
+            )
             
         except (ValueError, AttributeError) as e:
-            print(f"  ⚠️  Error parsing question: {e}")
+            logger.warning("  ⚠️  Error parsing question: %s", e)
+            skipped += 1
             continue
     
-    print(f"✅ Extracted {len(questions)} Physics questions")
-    with_answers = sum(1 for q in questions if q['has_answer'])
+    print(f"✅ Extracted {extracted} Physics questions")
+    if skipped:
+        print(f"⏭️  Skipped {skipped} question blocks (LOG_LEVEL=DEBUG for details)")
     print(f"✅ {with_answers} questions have answers from PDF")
+
+
+def extract_physics_questions_with_answers(pdf_path: Union[Path, PdfSession]) -> List[Question]:
+    """
+    Extract Physics questions from PDF WITH correct answers.
     
-    return questions
+    Args:
+        pdf_path: Path to NEET PDF, or an open PdfSession to reuse
+        
+    Returns:
+        List of Question records with number, text, options, and correct_answer
+    """
+    return list(iter_physics_questions_with_answers(pdf_path))
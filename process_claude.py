@@ -5,18 +5,175 @@ CRITICAL: AI must NEVER guess answers - only use answers extracted from PDF.
 """
 
 import argparse
-import json
+import copy
 import logging
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Optional
+from string import Template
+from typing import List, Dict, Optional, Tuple
 
+import orjson
 import requests
 
-from config import get_model_config, get_path_config, NEET_DB_SCHEMA
-from pdf_extractor import extract_physics_questions_improved
+from config import get_model_config, get_path_config, get_log_level, NEET_DB_SCHEMA
+from pdf_extractor import Question, extract_physics_questions_improved
 from cost_tracker import CostTracker
+from rate_limiter import RateLimiter, retry_after_seconds
+from response_cache import ResponseCache
+from json_extract import iter_json_objects
+from checkpoint import (
+    checkpoint_source, checkpoint_matches, load_checkpoint, open_checkpoint, append_checkpoint
+)
+
+
+# Instructions shared by every question. Sent as a cached system block, so
+# after the first call it is billed at the cache-read rate instead of full
+# input price. Filled in below for normal and split-model runs.
+SYSTEM_PROMPT_TEMPLATE = Template("""You are a NEET Physics expert. Generate detailed step-by-step solutions explaining the provided correct answer. NEVER guess or change the correct answer provided. Your job is to EXPLAIN, not to SOLVE.
+
+You are a NEET Physics question analyzer. Your task is to explain the solution, NOT to find the answer.
+
+Each request gives you a question, its four options, and the CORRECT ANSWER FROM PDF taken from the official NEET 2024 answer key. Treat that answer as final.
+
+Your task:
+1. Provide detailed step-by-step reasoning explaining WHY the given option is the correct answer
+2. $other_options
+3. Include relevant physics formulas and calculations with proper units
+4. Use clear, educational language suitable for NEET preparation
+5. Include NCERT chapter references where applicable
+
+Record the result by calling the emit_question tool:
+- examInfo: year 2024, examType "NEET", paperCode "2024-PHY"
+- questionText: the full question text
+- options: A-D with their text, isCorrect true only for the given correct answer, and $option_analysis
+- correctOption: the given correct answer
+- classification: subject "Physics" with the specific NCERT chapter, topic and class
+- stepByStep: steps with title, content, formula and key insight
+- quickMethod: {"trick": {"title": ..., "steps": [...]}, "timeManagement": {"totalTime": "2-3 min"}}
+- questionImages and solutionImages: empty arrays
+
+When a request holds several questions, call the emit_questions tool instead, with one entry per question in the order given.""")
+
+SYSTEM_PROMPT = SYSTEM_PROMPT_TEMPLATE.substitute(
+    other_options='Explain WHY each of the other options is incorrect',
+    option_analysis='a detailed analysis'
+)
+
+# When a second, cheaper model writes the incorrect-option analyses, the
+# main model is told to leave them empty and spends no output on them
+SPLIT_SYSTEM_PROMPT = SYSTEM_PROMPT_TEMPLATE.substitute(
+    other_options='Do NOT analyse the other options; their analyses are written separately',
+    option_analysis='a detailed analysis for the correct option only (an empty string for the others)'
+)
+
+# The per-question user message, filled in with str.format
+USER_PROMPT_TEMPLATE = """Question {number}: {question_text}
+
+Options:
+A) {options[A]}
+B) {options[B]}
+C) {options[C]}
+D) {options[D]}
+
+**CORRECT ANSWER FROM PDF: Option {answer}**
+
+This is Answer ({index}) from the official NEET 2024 answer key.
+
+**CRITICAL: The correct answer is {answer}. DO NOT change or question this answer. Your job is to EXPLAIN why it's correct.**
+
+Use "neet_2024_phy_{number:03d}" as the id and {number} as the questionNumber.
+
+REMEMBER: correctOption MUST be "{answer}" - do not change it!
+"""
+
+# Forcing this tool makes the API return the question as parsed, well-formed
+# JSON matching the database item schema; no JSON template in the prompt
+QUESTION_TOOL = {
+    'name': 'emit_question',
+    'description': 'Record the structured NEET question with its explained solution.',
+    'input_schema': NEET_DB_SCHEMA['properties']['questions']['items'],
+}
+
+# The same for a pack of questions answered by one call
+QUESTIONS_TOOL = {
+    'name': 'emit_questions',
+    'description': 'Record several structured NEET questions with their explained solutions.',
+    'input_schema': {
+        'type': 'object',
+        'properties': {'questions': NEET_DB_SCHEMA['properties']['questions']},
+        'required': ['questions'],
+    },
+}
+
+# Both tools go in every request, so single and packed calls share one
+# cached prompt prefix
+TOOLS = [QUESTION_TOOL, QUESTIONS_TOOL]
+
+# Split-model runs use the same tools with no minimum length on option
+# analyses, so the incorrect options' analyses can be left empty as instructed
+_SPLIT_ITEM_SCHEMA = copy.deepcopy(QUESTION_TOOL['input_schema'])
+del _SPLIT_ITEM_SCHEMA['properties']['options']['items']['properties']['analysis']['minLength']
+SPLIT_TOOLS = [
+    {**QUESTION_TOOL, 'input_schema': _SPLIT_ITEM_SCHEMA},
+    {**QUESTIONS_TOOL, 'input_schema': {
+        **QUESTIONS_TOOL['input_schema'],
+        'properties': {'questions': {**NEET_DB_SCHEMA['properties']['questions'], 'items': _SPLIT_ITEM_SCHEMA}},
+    }},
+]
+
+# The cheaper model's request: why each incorrect option is wrong, given
+# the main model's solution
+DISTRACTOR_PROMPT_TEMPLATE = """Question {number}: {question_text}
+
+Options:
+A) {options[A]}
+B) {options[B]}
+C) {options[C]}
+D) {options[D]}
+
+The correct answer is {answer}. Solution:
+{solution}
+
+For each incorrect option ({others}), explain in 1-3 sentences why it is wrong, for a NEET student. Call emit_option_analyses with one entry per incorrect option."""
+
+DISTRACTOR_TOOL = {
+    'name': 'emit_option_analyses',
+    'description': 'Record why each incorrect option is wrong.',
+    'input_schema': {
+        'type': 'object',
+        'properties': {
+            'analyses': {
+                'type': 'array',
+                'items': {
+                    'type': 'object',
+                    'properties': {
+                        'id': {'type': 'string', 'enum': ['A', 'B', 'C', 'D']},
+                        'analysis': {'type': 'string', 'minLength': 10},
+                    },
+                    'required': ['id', 'analysis'],
+                },
+            },
+        },
+        'required': ['analyses'],
+    },
+}
+
+# Output budget of a distractor call; three short analyses
+DISTRACTOR_MAX_TOKENS = 1024
+
+# Output budget cap for a whole pack, however many questions it holds
+MAX_PACK_TOKENS = 8192
+
+# Seconds to wait for a reply to a one-question request; packs get this per question
+REQUEST_TIMEOUT = 90
+
+# Heads a pack of USER_PROMPT_TEMPLATE blocks sent in one call
+PACK_PROMPT_HEAD = """There are {count} questions below, separated by ---. Call emit_questions once with one entry per question, in the order given.
+
+"""
 
 
 def setup_logging(log_dir: Path):
@@ -25,7 +182,7 @@ def setup_logging(log_dir: Path):
     log_file = log_dir / f"claude_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
     
     logging.basicConfig(
-        level=logging.INFO,
+        level=get_log_level(),
         format='%(asctime)s - %(levelname)s - %(message)s',
         handlers=[
             logging.FileHandler(log_file),
@@ -36,220 +193,159 @@ def setup_logging(log_dir: Path):
 
 
 def extract_json_from_response(text: str) -> dict:
-    """Extract JSON from Claude response."""
-    # Try to find JSON object
-    start = text.find('{')
-    end = text.rfind('}')
-    
-    if start != -1 and end != -1 and start < end:
-        json_str = text[start:end + 1]
+    """Extract the first valid JSON object from Claude response."""
+    for candidate in iter_json_objects(text):
         try:
-            return json.loads(json_str)
-        except json.JSONDecodeError:
-            pass
-    
-    # Try code blocks
-    if '```' in text:
-        parts = text.split('```')
-        for part in parts:
-            part = part.strip()
-            if part.startswith('json'):
-                part = part[4:].strip()
-            if part.startswith('{') and part.endswith('}'):
-                try:
-                    return json.loads(part)
-                except json.JSONDecodeError:
-                    continue
+            return orjson.loads(candidate)
+        except orjson.JSONDecodeError:
+            continue
     
     raise ValueError("Could not extract valid JSON from response")
 
 
-def call_claude_api(
-    question: dict,
-    model_config,
-    logger: logging.Logger,
-    cost_tracker: CostTracker
-) -> Optional[dict]:
+def create_session(model_config) -> requests.Session:
     """
-    Call Claude API to structure a question.
-    CRITICAL: Uses the correct answer from PDF, does NOT guess.
+    Create a keep-alive session carrying the Anthropic auth headers.
+    
+    The connection pool is sized for MAX_CONCURRENCY workers, so each
+    worker reuses an open TLS connection instead of reconnecting per call.
+    Retries stay in call_claude_api, so the adapter never retries itself.
     """
-    headers = {
+    session = requests.Session()
+    session.headers.update({
         'x-api-key': model_config.api_key,
         'anthropic-version': model_config.anthropic_version,
         'content-type': 'application/json'
-    }
-    
-    # Construct prompt that FORCES use of PDF answer
-    user_prompt = f"""You are a NEET Physics question analyzer. Your task is to explain the solution, NOT to find the answer.
-
-Question {question['number']}: {question['question_text']}
-
-Options:
-A) {question['options']['A']}
-B) {question['options']['B']}
-C) {question['options']['C']}
-D) {question['options']['D']}
-
-**CORRECT ANSWER FROM PDF: Option {question['correct_answer']}**
+    })
+    adapter = requests.adapters.HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=model_config.concurrency,
+        max_retries=0
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
 
-This is Answer ({question['correct_index']}) from the official NEET 2024 answer key.
 
-**CRITICAL: The correct answer is {question['correct_answer']}. DO NOT change or question this answer. Your job is to EXPLAIN why it's correct.**
+def _prompt_prefix(split_model: bool) -> Tuple[str, List[dict]]:
+    """The system prompt and tools of every structuring request."""
+    return (SPLIT_SYSTEM_PROMPT, SPLIT_TOOLS) if split_model else (SYSTEM_PROMPT, TOOLS)
 
-Your task:
-1. Provide detailed step-by-step reasoning explaining WHY option {question['correct_answer']} is the correct answer
-2. Explain WHY each of the other options is incorrect
-3. Include relevant physics formulas and calculations with proper units
-4. Use clear, educational language suitable for NEET preparation
-5. Include NCERT chapter references where applicable
 
-Return ONLY valid JSON matching this structure:
-{{
-  "id": "neet_2024_phy_{question['number']:03d}",
-  "questionNumber": {question['number']},
-  "examInfo": {{
-    "year": 2024,
-    "examType": "NEET",
-    "paperCode": "2024-PHY"
-  }},
-  "title": "Brief descriptive title (max 80 chars)",
-  "questionText": "{question['question_text'][:200]}...",
-  "options": [
-    {{
-      "id": "A",
-      "text": "{question['options']['A'][:50]}...",
-      "isCorrect": {"true" if question['correct_answer'] == 'A' else "false"},
-      "analysis": "Detailed explanation"
-    }},
-    {{
-      "id": "B",
-      "text": "{question['options']['B'][:50]}...",
-      "isCorrect": {"true" if question['correct_answer'] == 'B' else "false"},
-      "analysis": "Detailed explanation"
-    }},
-    {{
-      "id": "C",
-      "text": "{question['options']['C'][:50]}...",
-      "isCorrect": {"true" if question['correct_answer'] == 'C' else "false"},
-      "analysis": "Detailed explanation"
-    }},
-    {{
-      "id": "D",
-      "text": "{question['options']['D'][:50]}...",
-      "isCorrect": {"true" if question['correct_answer'] == 'D' else "false"},
-      "analysis": "Detailed explanation"
-    }}
-  ],
-  "correctOption": "{question['correct_answer']}",
-  "classification": {{
-    "subject": "Physics",
-    "chapter": "Specific NCERT chapter name",
-    "topic": "Specific topic",
-    "subtopic": "If applicable",
-    "ncertClass": 11 or 12,
-    "difficulty": "Easy", "Medium", or "Hard",
-    "estimatedTime": 2-5,
-    "conceptTags": ["concept1", "concept2", "concept3"],
-    "bloomsLevel": "remember", "understand", "apply", "analyze", "evaluate", or "create"
-  }},
-  "stepByStep": [
-    {{
-      "title": "Step 1: Understand the Problem",
-      "content": "Detailed explanation",
-      "formula": "Relevant formula",
-      "insight": "Key insight"
-    }}
-  ],
-  "quickMethod": {{
-    "trick": {{
-      "title": "Quick approach",
-      "steps": ["step1", "step2"]
-    }},
-    "timeManagement": {{
-      "totalTime": "2-3 min"
-    }}
-  }},
-  "questionImages": [],
-  "solutionImages": []
-}}
-
-REMEMBER: correctOption MUST be "{question['correct_answer']}" - do not change it!
-"""
-
-    payload = {
+def _build_payload(user_prompt: str, tool: dict, max_tokens: int, model_config) -> dict:
+    """Assemble a Messages API request that forces a call of `tool`."""
+    system_prompt, tools = _prompt_prefix(model_config.split_model)
+    return {
         'model': model_config.model_name,
-        'max_tokens': model_config.max_tokens,
+        'max_tokens': max_tokens,
         'temperature': model_config.temperature,
-        'system': 'You are a NEET Physics expert. Generate detailed step-by-step solutions explaining the provided correct answer. NEVER guess or change the correct answer provided. Your job is to EXPLAIN, not to SOLVE.',
+        'system': [{
+            'type': 'text',
+            'text': system_prompt,
+            'cache_control': {'type': 'ephemeral'}
+        }],
         'messages': [{
             'role': 'user',
             'content': user_prompt
-        }]
+        }],
+        # Tools precede the system block in the prompt, so the system
+        # cache breakpoint covers the tool schemas as well
+        'tools': tools,
+        'tool_choice': {'type': 'tool', 'name': tool['name']}
         # Web search disabled to reduce costs (55x token reduction)
-        # Can be re-enabled by uncommenting the tools section below:
-        # 'tools': [{
+        # Re-enabling it means adding it to 'tools' and relaxing tool_choice to 'auto':
+        # {
         #     'type': 'web_search_20250305',
         #     'name': 'web_search',
         #     'max_uses': 3
-        # }]
+        # }
     }
+
+
+def _question_prompt(question: Question) -> str:
+    """The user message block for one question."""
+    return USER_PROMPT_TEMPLATE.format(
+        number=question.number,
+        question_text=question.question_text,
+        options=question.options,
+        answer=question.correct_answer,
+        index=question.correct_index
+    )
+
+
+def _send_with_retries(
+    payload: dict,
+    label: str,
+    model_config,
+    logger: logging.Logger,
+    cost_tracker: CostTracker,
+    rate_limiter: RateLimiter,
+    session: requests.Session,
+    timeout: float = REQUEST_TIMEOUT
+) -> Optional[dict]:
+    """
+    Send a request, retrying until it yields the forced tool call's input.
     
+    The reply is generated in full before it is sent, so pass a longer
+    timeout for requests with a larger output budget.
+    
+    Returns:
+        The tool input (or JSON found in text blocks), or None once retries run out
+    """
     last_error = None
     for attempt in range(1, model_config.max_retries + 1):
+        rate_limited = False
         try:
-            logger.info(f"  API call attempt {attempt}/{model_config.max_retries}")
+            rate_limiter.acquire()
+            logger.info(f"  {label}: API call attempt {attempt}/{model_config.max_retries}")
             
-            response = requests.post(
+            response = session.post(
                 f"{model_config.base_url}/v1/messages",
-                headers=headers,
-                json=payload,
-                timeout=90
+                data=orjson.dumps(payload),
+                timeout=timeout
             )
+            rate_limiter.update_from_headers(response.headers)
+            
+            if response.status_code == 429:
+                # Hold every worker for as long as the server asks, not error_delay
+                rate_limited = True
+                rate_limiter.pause_for(retry_after_seconds(response.headers, model_config.error_delay))
             
             if response.status_code >= 400:
                 error_msg = response.text[:300]
                 logger.error(f"  HTTP {response.status_code}: {error_msg}")
                 raise RuntimeError(f"API error: {error_msg}")
             
-            data = response.json()
-            
-            # Extract content from Claude response
-            content_blocks = data.get('content', [])
-            content = ''
-            
-            for block in content_blocks:
-                if block.get('type') == 'text':
-                    content += block.get('text', '')
+            data = orjson.loads(response.content)
             
             # Track token usage
             usage = data.get('usage', {})
             input_tokens = usage.get('input_tokens', 0)
             output_tokens = usage.get('output_tokens', 0)
+            cache_write = usage.get('cache_creation_input_tokens', 0)
+            cache_read = usage.get('cache_read_input_tokens', 0)
             
-            cost_tracker.record_call(input_tokens, output_tokens, success=True)
-            logger.info(f"  Tokens: {input_tokens} in, {output_tokens} out")
-            
-            # Parse JSON response
-            result = extract_json_from_response(content)
-            
-            # CRITICAL: Verify answer wasn't changed
-            if result.get('correctOption') != question['correct_answer']:
-                logger.error(f"  ❌ AI tried to change answer from {question['correct_answer']} to {result.get('correctOption')}!")
-                logger.error(f"  🔒 FORCING correct answer: {question['correct_answer']}")
-                result['correctOption'] = question['correct_answer']
-                
-                # Also fix in options array
-                for opt in result.get('options', []):
-                    opt['isCorrect'] = (opt['id'] == question['correct_answer'])
-            
-            # Ensure required fields
-            result.setdefault('id', f"neet_2024_phy_{question['number']:03d}")
-            result.setdefault('questionNumber', question['number'])
-            result.setdefault('questionText', question['question_text'])
-            result.setdefault('correctOption', question['correct_answer'])
+            cost_tracker.record_call(
+                input_tokens, output_tokens, success=True,
+                cache_creation_tokens=cache_write, cache_read_tokens=cache_read
+            )
+            logger.info(
+                f"  Tokens: {input_tokens} in, {output_tokens} out "
+                f"(cache: {cache_write} written, {cache_read} read)"
+            )
             
-            logger.info(f"  ✅ Successfully parsed response")
+            # The forced tool call carries the result as parsed JSON; fall
+            # back to scanning any text blocks if it is missing
+            content_blocks = data.get('content', [])
+            result = next(
+                (block['input'] for block in content_blocks if block.get('type') == 'tool_use'),
+                None
+            )
+            if result is None:
+                content = ''.join(
+                    block.get('text', '') for block in content_blocks if block.get('type') == 'text'
+                )
+                result = extract_json_from_response(content)
             return result
             
         except Exception as e:
@@ -257,16 +353,228 @@ REMEMBER: correctOption MUST be "{question['correct_answer']}" - do not change i
             logger.warning(f"  ❌ Attempt {attempt} failed: {e}")
             cost_tracker.record_call(0, 0, success=False)
             
-            if attempt < model_config.max_retries:
+            if attempt < model_config.max_retries and not rate_limited:
                 time.sleep(model_config.error_delay)
-        finally:
-            # Rate limiting
-            time.sleep(model_config.rate_limit_delay)
     
     logger.error(f"  ⛔ All retries exhausted. Last error: {last_error}")
     return None
 
 
+def _finish_result(result: dict, question: Question, logger: logging.Logger) -> Optional[dict]:
+    """
+    Pin the PDF answer and fill the fields every result must carry.
+    
+    Returns None for a result whose options are not objects with an id,
+    so that question is treated as failed instead of aborting the run.
+    """
+    options = result.get('options', []) if isinstance(result, dict) else None
+    if not isinstance(options, list) or not all(isinstance(opt, dict) and 'id' in opt for opt in options):
+        logger.error(f"  ❌ Q{question.number}: malformed result, options must be objects with an id")
+        return None
+    
+    # CRITICAL: Verify answer wasn't changed
+    if result.get('correctOption') != question.correct_answer:
+        logger.error(f"  ❌ AI tried to change answer from {question.correct_answer} to {result.get('correctOption')}!")
+        logger.error(f"  🔒 FORCING correct answer: {question.correct_answer}")
+        result['correctOption'] = question.correct_answer
+        
+        # Also fix in options array
+        for opt in options:
+            opt['isCorrect'] = (opt['id'] == question.correct_answer)
+    
+    # Ensure required fields
+    result.setdefault('id', f"neet_2024_phy_{question.number:03d}")
+    result.setdefault('questionNumber', question.number)
+    result.setdefault('questionText', question.question_text)
+    result.setdefault('correctOption', question.correct_answer)
+    return result
+
+
+def call_claude_api(
+    question: Question,
+    model_config,
+    logger: logging.Logger,
+    cost_tracker: CostTracker,
+    rate_limiter: RateLimiter,
+    session: requests.Session,
+    cache: Optional[ResponseCache] = None
+) -> Optional[dict]:
+    """
+    Call Claude API to structure a question.
+    CRITICAL: Uses the correct answer from PDF, does NOT guess.
+    
+    Requests are paced by the shared rate_limiter and sent over a session
+    from create_session. Pass a ResponseCache to reuse results from earlier
+    runs of the same request.
+    """
+    # Only the per-question facts go in the user message; the instructions and
+    # tool schemas are the cached prompt prefix shared by every call
+    payload = _build_payload(
+        _question_prompt(question), QUESTION_TOOL, model_config.max_tokens, model_config
+    )
+    
+    cache_key = None
+    if cache is not None:
+        cache_key = ResponseCache.key_for(payload)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"  💾 Q{question.number}: Using cached response")
+            return cached
+    
+    result = _send_with_retries(payload, f"Q{question.number}", model_config, logger,
+                                cost_tracker, rate_limiter, session)
+    if result is None:
+        return None
+    
+    result = _finish_result(result, question, logger)
+    if result is None:
+        return None
+    if cache is not None:
+        cache.put(cache_key, result)
+    
+    logger.info(f"  ✅ Successfully parsed response")
+    return result
+
+
+def call_claude_api_pack(
+    questions: List[Question],
+    model_config,
+    logger: logging.Logger,
+    cost_tracker: CostTracker,
+    rate_limiter: RateLimiter,
+    session: requests.Session,
+    cache: Optional[ResponseCache] = None
+) -> List[Optional[dict]]:
+    """
+    Structure a pack of questions with one Claude API call.
+    
+    The reply's entries are matched back to the questions by
+    questionNumber; any question missing from it is sent on its own
+    with call_claude_api.
+    
+    Returns:
+        Structured question dict or None per question, in order
+    """
+    if len(questions) == 1:
+        return [call_claude_api(questions[0], model_config, logger, cost_tracker, rate_limiter, session, cache)]
+    
+    label = f"Q{questions[0].number}-Q{questions[-1].number}"
+    user_prompt = PACK_PROMPT_HEAD.format(count=len(questions)) + '\n---\n\n'.join(
+        _question_prompt(q) for q in questions
+    )
+    payload = _build_payload(
+        user_prompt, QUESTIONS_TOOL, min(MAX_PACK_TOKENS, model_config.max_tokens * len(questions)), model_config
+    )
+    
+    cache_key = None
+    by_number = {}
+    if cache is not None:
+        cache_key = ResponseCache.key_for(payload)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"  💾 {label}: Using cached response")
+            by_number = {item['questionNumber']: item for item in cached['questions']}
+    
+    if not by_number:
+        reply = _send_with_retries(payload, label, model_config, logger, cost_tracker, rate_limiter, session,
+                                   timeout=REQUEST_TIMEOUT * len(questions))
+        items = reply.get('questions') if isinstance(reply, dict) else None
+        numbers = {q.number for q in questions}
+        for item in items if isinstance(items, list) else []:
+            if isinstance(item, dict) and item.get('questionNumber') in numbers:
+                by_number.setdefault(item['questionNumber'], item)
+        
+        # A malformed entry is dropped, so its question is sent on its own
+        for q in questions:
+            if q.number in by_number:
+                result = _finish_result(by_number.pop(q.number), q, logger)
+                if result is not None:
+                    by_number[q.number] = result
+        if cache is not None and len(by_number) == len(questions):
+            cache.put(cache_key, {'questions': [by_number[q.number] for q in questions]})
+    
+    missing = [q.number for q in questions if q.number not in by_number]
+    if missing:
+        logger.warning(f"  ⚠️  {label}: reply is missing {missing}, sending those one by one")
+    else:
+        logger.info(f"  ✅ Successfully parsed {label}")
+    
+    return [
+        by_number.get(q.number)
+        or call_claude_api(q, model_config, logger, cost_tracker, rate_limiter, session, cache)
+        for q in questions
+    ]
+
+
+def add_distractor_analyses(
+    result: dict,
+    question: Question,
+    model_config,
+    logger: logging.Logger,
+    cost_tracker: CostTracker,
+    rate_limiter: RateLimiter,
+    session: requests.Session,
+    cache: Optional[ResponseCache] = None
+) -> bool:
+    """
+    Fill the incorrect options' analyses of a split-model result.
+    
+    The main model wrote the solution and the correct option's analysis;
+    model_config.distractor_model_name explains the other three from that
+    solution. Returns False if the analyses could not be generated, including
+    when either model's output is malformed, so only that question fails.
+    """
+    others = [letter for letter in 'ABCD' if letter != question.correct_answer]
+    steps = result.get('stepByStep')
+    solution = '\n'.join(
+        f"- {step.get('title', '')}: {step.get('content', '')}"
+        for step in (steps if isinstance(steps, list) else [])
+        if isinstance(step, dict)
+    )
+    payload = {
+        'model': model_config.distractor_model_name,
+        'max_tokens': DISTRACTOR_MAX_TOKENS,
+        'temperature': model_config.temperature,
+        'messages': [{
+            'role': 'user',
+            'content': DISTRACTOR_PROMPT_TEMPLATE.format(
+                number=question.number,
+                question_text=question.question_text,
+                options=question.options,
+                answer=question.correct_answer,
+                solution=solution,
+                others=', '.join(others)
+            )
+        }],
+        'tools': [DISTRACTOR_TOOL],
+        'tool_choice': {'type': 'tool', 'name': DISTRACTOR_TOOL['name']}
+    }
+    
+    cache_key = ResponseCache.key_for(payload) if cache is not None else None
+    reply = cache.get(cache_key) if cache is not None else None
+    if reply is None:
+        reply = _send_with_retries(payload, f"Q{question.number} distractors", model_config, logger,
+                                   cost_tracker, rate_limiter, session)
+    
+    entries = reply.get('analyses') if isinstance(reply, dict) else None
+    if not isinstance(entries, list):
+        return False
+    analyses = {
+        entry.get('id'): entry.get('analysis')
+        for entry in entries
+        if isinstance(entry, dict)
+    }
+    if not all(analyses.get(letter) and isinstance(analyses[letter], str) for letter in others):
+        return False
+    if cache is not None:
+        cache.put(cache_key, reply)
+    
+    for opt in result.get('options', []):
+        if opt.get('id') in others:
+            opt['analysis'] = analyses[opt['id']]
+    return True
+
+
 def main():
     """Main entry point."""
     parser = argparse.ArgumentParser(
@@ -282,6 +590,22 @@ def main():
         type=int,
         help='End at specific question number'
     )
+    parser.add_argument(
+        '--questions-per-call',
+        type=int,
+        default=4,
+        help='Questions structured by each API call (default: 4)'
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Ignore cached responses from earlier runs and call the API for every question'
+    )
+    parser.add_argument(
+        '--restart',
+        action='store_true',
+        help='Discard the checkpoint of earlier runs instead of resuming from it'
+    )
     
     args = parser.parse_args()
     
@@ -301,6 +625,8 @@ def main():
     logger.info("🚀 NEET Question Processor with Claude (No Guessing)")
     logger.info("="*60)
     logger.info(f"Model: {model_config.model_name}")
+    if model_config.split_model:
+        logger.info(f"Incorrect-option analyses: {model_config.distractor_model_name}")
     logger.info(f"PDF: {path_config.pdf_path}")
     logger.info("="*60)
     
@@ -312,7 +638,7 @@ def main():
         if args.start_question or args.end_question:
             start = args.start_question or 1
             end = args.end_question or float('inf')
-            questions = [q for q in questions if start <= q['number'] <= end]
+            questions = [q for q in questions if start <= q.number <= end]
             logger.info(f"📌 Filtered to questions {start}-{end}: {len(questions)} questions")
         
         if not questions:
@@ -323,41 +649,100 @@ def main():
         logger.error(f"❌ PDF extraction failed: {e}")
         return 1
     
+    # Each result is appended to the checkpoint as soon as it arrives, so a
+    # crash loses nothing and a rerun resumes where the last one stopped.
+    # Its header records the PDF, models and prompts the results came from,
+    # so a run with any of them changed does not reuse stale results
+    output_path = path_config.output_path.parent / 'neet_2024_physics_claude.json'
+    checkpoint_path = output_path.with_suffix('.ndjson')
+    system_prompt, tools = _prompt_prefix(model_config.split_model)
+    source = checkpoint_source(
+        path_config.pdf_path,
+        model=model_config.model_name,
+        distractor_model=model_config.distractor_model_name if model_config.split_model else None,
+        prompts=ResponseCache.key_for({'system': system_prompt, 'user': USER_PROMPT_TEMPLATE, 'tools': tools})
+    )
+    if args.restart:
+        checkpoint_path.unlink(missing_ok=True)
+    elif not checkpoint_matches(checkpoint_path, source):
+        logger.error(f"❌ {checkpoint_path.name} was made from a different PDF, model or prompt")
+        logger.error("💡 Pass --restart to discard it and process every question again")
+        return 1
+    done = load_checkpoint(checkpoint_path).keys()
+    if done:
+        logger.info(f"♻️  Resuming: {len(done)} questions already in {checkpoint_path.name}")
+    
     # Process questions
     cost_tracker = CostTracker()
-    all_results = []
     
+    # CRITICAL: Skip if no answer from PDF
+    answered = []
     for q in questions:
-        q_num = q['number']
-        logger.info(f"\n📝 Processing Q{q_num}")
-        
-        # CRITICAL: Skip if no answer from PDF
-        if not q.get('correct_answer'):
-            logger.warning(f"  ⚠️  No answer in PDF, skipping (NO GUESSING ALLOWED)")
+        if not q.correct_answer:
+            logger.warning(f"  ⚠️  Q{q.number}: No answer in PDF, skipping (NO GUESSING ALLOWED)")
             continue
-        
-        logger.info(f"  📄 PDF Answer: {q['correct_answer']} (Option {q['correct_index']})")
+        if q.number in done:
+            continue
+        answered.append(q)
+    
+    checkpoint_lock = threading.Lock()
+    
+    def process_pack(pack: List[Question]) -> None:
+        for q in pack:
+            logger.info(f"\n📝 Processing Q{q.number}")
+            logger.info(f"  📄 PDF Answer: {q.correct_answer} (Option {q.correct_index})")
         
         # Call Claude
-        structured = call_claude_api(q, model_config, logger, cost_tracker)
+        results = call_claude_api_pack(pack, model_config, logger, cost_tracker, rate_limiter, session, cache)
         
-        if not structured:
-            logger.error(f"  ❌ API call failed")
-            continue
-        
-        all_results.append(structured)
-        logger.info(f"  ✅ Successfully processed Q{q_num}")
+        for q, structured in zip(pack, results):
+            if not structured:
+                logger.error(f"  ❌ Q{q.number}: API call failed")
+                continue
+            
+            if model_config.split_model and not add_distractor_analyses(
+                structured, q, model_config, logger, cost_tracker, rate_limiter, session, cache
+            ):
+                logger.error(f"  ❌ Q{q.number}: Incorrect-option analyses failed")
+                continue
+            
+            with checkpoint_lock:
+                append_checkpoint(checkpoint, structured)
+            logger.info(f"  ✅ Successfully processed Q{q.number}")
         
         # Print cost so far
         logger.info(f"\n💰 Cost so far: ${cost_tracker.estimate_cost():.4f}")
     
+    # Several questions go in each call, so the per-request overhead and the
+    # cached prefix are shared across the pack
+    per_call = max(1, args.questions_per_call)
+    packs = [answered[i:i + per_call] for i in range(0, len(answered), per_call)]
+    
+    # Requests are I/O bound, so run up to MAX_CONCURRENCY at once over one
+    # pooled session
+    logger.info(f"⚡ Processing {len(answered)} questions in {len(packs)} calls, "
+                f"{model_config.concurrency} at a time")
+    # Average one request per RATE_LIMIT_DELAY, letting each worker start at once
+    rate_limiter = RateLimiter.from_delay(model_config.rate_limit_delay, burst=model_config.concurrency)
+    cache = None if args.no_cache else ResponseCache(path_config.cache_file)
+    try:
+        with create_session(model_config) as session, open_checkpoint(checkpoint_path, source) as checkpoint:
+            with ThreadPoolExecutor(max_workers=model_config.concurrency) as executor:
+                for _ in executor.map(process_pack, packs):
+                    pass
+    finally:
+        if cache is not None:
+            cache.close()
+    
     logger.info(f"\n{'='*60}")
     logger.info(f"✅ Processing complete!")
     logger.info(f"{'='*60}")
     
     cost_tracker.print_summary()
     
-    # Save results
+    # Save results: everything checkpointed so far, in question order
+    results = load_checkpoint(checkpoint_path)
+    all_results = [results[number] for number in sorted(results)]
     output = {
         'metadata': {
             'version': '3.0',
@@ -371,9 +756,8 @@ def main():
         'questions': all_results
     }
     
-    output_path = path_config.output_path.parent / 'neet_2024_physics_claude.json'
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(output, f, ensure_ascii=False, indent=2)
+    with open(output_path, 'wb') as f:
+        f.write(orjson.dumps(output))
     
     logger.info(f"\n📁 Saved to: {output_path}")
     logger.info(f"📊 Total questions: {len(all_results)}")
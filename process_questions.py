@@ -3,34 +3,67 @@ r"""
 NEET 2024 Physics Question Extractor and Structuring Pipeline
 
 - Extract raw text from the NEET_2024_Physics.pdf using PyMuPDF
-- Parse question blocks using regex r'(\d+)\.\s+(.*?)(?=\d+\.|$)'
-- For each question, call Perplexity (sonar model) to structure data according to JSON schema
+- Split question blocks at "N." anchors at the start of a line
+- Call Perplexity (sonar model) on batches of questions to structure data according to JSON schema
 - Validate outputs using jsonschema
 - Write final file neet_2024_physics.json with metadata
 """
 
-import json
+import argparse
+import logging
+import os
 import re
 import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Optional
 
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
 import fitz  # PyMuPDF
 from jsonschema import Draft7Validator, ValidationError
 
-# Perplexity API configuration
-PPLX_API_KEY = os.getenv('PERPLEXITY_API_KEY')  # Load from environment
+from checkpoint import (
+    checkpoint_source, checkpoint_matches, load_checkpoint, open_checkpoint, append_checkpoint
+)
+from json_extract import iter_json_objects
+from rate_limiter import RateLimiter, retry_after_seconds
+from response_cache import ResponseCache
+
+logger = logging.getLogger(__name__)
+
+# Perplexity API configuration (the key comes from --api-key or PERPLEXITY_API_KEY)
 PPLX_ENDPOINT = "https://api.perplexity.ai/chat/completions"
 PPLX_MODEL = "sonar"  # Updated to current valid model (Feb 2025)
 
-# File locations
+# Default file locations, overridable with --pdf and --out
 PDF_PATH = Path("/home/harish/Desktop/neet-learning-platform/NEET_2024_Physics.pdf")
 OUTPUT_PATH = Path("/home/harish/Desktop/NEET2025/question_extractor/neet_2024_physics.json")
+CACHE_FILENAME = "pplx_cache.sqlite3"  # Structured responses from earlier runs, beside the output
 
 # Rate limiting and retry
-RATE_LIMIT_DELAY = 1.0   # 1 second between calls
-ERROR_DELAY = 5.0        # 5 seconds on error
+REQUESTS_PER_MINUTE = 50  # Perplexity's sustained request ceiling
+ERROR_DELAY = 5.0         # 5 seconds on first error, doubling per retry
+MAX_ERROR_DELAY = 60.0    # Backoff cap
 MAX_RETRIES = 5
+MAX_CONCURRENCY = 8       # Default requests in flight at once (--concurrency)
+BATCH_SIZE = 5            # Default questions structured per request (--batch-size)
+MAX_ITEM_TOKENS = 1200    # Response token cap per question; a full item needs ~800
+MAX_BATCH_TOKENS = 8192   # Response token cap for a whole batch
+THROTTLE_STATUSES = (429, 503)
+
+# Shared by all worker threads; only waits when the request budget is spent
+RATE_LIMITER = RateLimiter(REQUESTS_PER_MINUTE / 60.0, burst=MAX_CONCURRENCY)
+
+# One pooled session for all calls, so worker threads reuse open
+# connections instead of paying a TLS handshake per question. It outlives
+# main(), so several PDFs processed in one interpreter share it.
+# Retries are handled in _post_with_retries, not by the adapter.
+SESSION = requests.Session()
+SESSION.headers["Content-Type"] = "application/json"
+SESSION.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=MAX_CONCURRENCY, max_retries=0))
 
 # Complete NEET Questions Database JSON Schema
 NEET_DB_SCHEMA = {
@@ -197,81 +230,30 @@ NEET_DB_SCHEMA = {
     "required": ["metadata", "questions"]
 }
 
-QUESTION_PATTERN = re.compile(r'(\d+)\.\s+(.*?)(?=\d+\.|$)', re.S)
-
-
-def process_pdf(pdf_path: Path) -> str:
-    """Extract all text from PDF using PyMuPDF."""
-    if not pdf_path.exists():
-        raise FileNotFoundError(f"PDF not found at {pdf_path}")
-    chunks = []
-    with fitz.open(pdf_path) as doc:
-        for page in doc:
-            chunks.append(page.get_text())
-    return "\n".join(chunks)
-
-
-def extract_questions(raw_text: str):
-    """
-    Extract questions using the given regex pattern.
-    Returns a list of dicts: [{"number": int, "text": str}, ...]
-    """
-    results = []
-    for match in QUESTION_PATTERN.finditer(raw_text):
-        try:
-            number = int(match.group(1))
-        except Exception:
-            # Fallback if conversion fails
-            number = match.group(1)
-        text = match.group(2).strip()
-        results.append({"number": number, "text": text})
-    return results
-
-
-def extract_json_from_text(text: str):
-    """
-    Extract the first JSON object from a text block.
-    Tries raw braces and fenced code blocks.
-    """
-    start = text.find("{")
-    end = text.rfind("}")
-    if start != -1 and end != -1 and start < end:
-        snippet = text[start:end + 1]
-        try:
-            return json.loads(snippet)
-        except Exception:
-            pass
-    if "```" in text:
-        parts = text.split("```")
-        for p in parts:
-            s = p.strip()
-            if s.startswith("{") and s.endswith("}"):
-                try:
-                    return json.loads(s)
-                except Exception:
-                    continue
-    raise ValueError("Could not parse JSON from model response")
-
-
-def call_perplexity(question: dict, schema: dict) -> dict:
-    """
-    Sends the question to Perplexity with instructions to produce JSON
-    conforming to the provided schema. Implements retry and rate limiting.
-    """
-    headers = {
-        "Authorization": f"Bearer {PPLX_API_KEY}",
-        "Content-Type": "application/json"
-    }
-
-    # Create a comprehensive prompt
-    user_prompt = f"""Convert this NEET 2024 Physics question into structured JSON following this schema:
-
-Question {question["number"]}: {question["text"]}
-
-Required JSON structure:
-- id: Format as "neet_2024_phy_{question['number']:03d}"
-- questionNumber: {question['number']}
-- examInfo: {{year: 2024, examType: "NEET", paperCode: "2024-PHY"}}
+# Compiled once at import rather than on every validation
+DATASET_VALIDATOR = Draft7Validator(NEET_DB_SCHEMA)
+# Checks each structured question as it arrives, while it can still be retried
+ITEM_VALIDATOR = Draft7Validator(NEET_DB_SCHEMA["properties"]["questions"]["items"])
+
+# Patterns and enums of the item schema that models most often get wrong,
+# checked before the full validator so a bad reply is rejected cheaply
+ID_RE = re.compile(r'^neet_\d{4}_[a-z]{3}_\d{3}$')
+TOTAL_TIME_RE = re.compile(r'^\d+\s+(min|sec)$')
+OPTION_IDS = frozenset(("A", "B", "C", "D"))
+EXAM_TYPES = frozenset(("NEET", "AIPMT", "AIIMS", "JIPMER"))
+DIFFICULTIES = frozenset(("Easy", "Medium", "Hard"))
+BLOOMS_LEVELS = frozenset(("remember", "understand", "apply", "analyze", "evaluate", "create"))
+
+# Static parts of every request, built once at import
+SYSTEM_MESSAGE = {"role": "system", "content": "You are a NEET question formatter. Return only valid JSON matching the schema exactly."}
+PAYLOAD_BASE = {
+    "model": PPLX_MODEL,
+    "temperature": 0.2,
+    "max_tokens": MAX_ITEM_TOKENS
+}
+# Field guide shared by the single and batched prompts (str.format
+# templates, so literal braces are doubled)
+ITEM_FIELDS_GUIDE = """- examInfo: {{year: 2024, examType: "NEET", paperCode: "2024-PHY"}}
 - title: Brief descriptive title
 - questionText: The full question text
 - options: Array of 4 objects with id (A-D), text, isCorrect (boolean), analysis
@@ -290,86 +272,448 @@ Required JSON structure:
 - stepByStep: Array of solution steps with title and content (minimum)
 - quickMethod: Optional shortcut approach
 - questionImages, solutionImages, stepImages: Use empty arrays [] if no images
+"""
+
+USER_PROMPT_TEMPLATE = """Convert this NEET 2024 Physics question into structured JSON following this schema:
+
+Question {number}: {text}
 
+Required JSON structure:
+- id: Format as "neet_2024_phy_{number:03d}"
+- questionNumber: {number}
+""" + ITEM_FIELDS_GUIDE + """
 Return ONLY valid JSON, no additional text."""
 
-    payload = {
-        "model": PPLX_MODEL,
-        "messages": [
-            {"role": "system", "content": "You are a NEET question formatter. Return only valid JSON matching the schema exactly."},
-            {"role": "user", "content": user_prompt}
-        ],
-        "temperature": 0.2,
-        "max_tokens": 2000
-    }
+BATCH_PROMPT_TEMPLATE = """Convert these {count} NEET 2024 Physics questions into structured JSON following this schema:
+
+{questions}
+
+Return a JSON object {{"items": [...]}} with one entry per question, in the order given.
+
+Required JSON structure of each entry:
+- id: Format as "neet_2024_phy_" followed by the 3-digit question number
+- questionNumber: The question number
+""" + ITEM_FIELDS_GUIDE + """
+Return ONLY valid JSON, no additional text."""
+
+# Plain reading-order text is all the question split needs: no layout sort
+# and no extraction flags (ligature, whitespace and clip handling)
+TEXT_FLAGS = 0
+
+# Larger PDFs are read by worker processes, a few pages each
+PARALLEL_MIN_PAGES = 8
+PAGES_PER_CHUNK = 4
+
+# "N." at the start of a line opens a question; its text runs to the next anchor
+QUESTION_ANCHOR = re.compile(r'^[ \t]*(\d+)\.\s+', re.M)
+
+
+@dataclass(slots=True, frozen=True)
+class QuestionCandidate:
+    """A numbered question block found in the PDF text."""
+
+    number: int
+    text: str
+
+
+def _extract_page_chunk(chunk):
+    """Worker: open the PDF and extract text of pages [start, end)."""
+    path_str, start, end = chunk
+    with fitz.open(path_str) as doc:
+        return [doc[i].get_text("text", sort=False, flags=TEXT_FLAGS) for i in range(start, end)]
+
 
+def iter_pages(pdf_path: Path):
+    """
+    Yield the text of each PDF page in turn using PyMuPDF.
+    
+    Text extraction holds the GIL, so PDFs of PARALLEL_MIN_PAGES or more
+    are split into chunks read by worker processes, each opening its own
+    copy of the file. Pages are still yielded in order.
+    """
+    if not pdf_path.exists():
+        raise FileNotFoundError(f"PDF not found at {pdf_path}")
+    with fitz.open(pdf_path) as doc:
+        page_count = doc.page_count
+        chunks = [
+            (str(pdf_path), i, min(i + PAGES_PER_CHUNK, page_count))
+            for i in range(0, page_count, PAGES_PER_CHUNK)
+        ]
+        workers = min(os.cpu_count() or 1, len(chunks))
+        if page_count < PARALLEL_MIN_PAGES or workers < 2:
+            for page in doc:
+                yield page.get_text("text", sort=False, flags=TEXT_FLAGS)
+            return
+    
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for texts in executor.map(_extract_page_chunk, chunks):
+            yield from texts
+
+
+def extract_questions(pages):
+    """
+    Extract questions by splitting the text at question-number anchors.
+    
+    One linear pass finds the anchors; each question is the slice between
+    its anchor and the next. Pages are scanned as they arrive and only the
+    last, still-open question is carried into the next page, so the whole
+    document is never joined into one string.
+    
+    Returns a list of QuestionCandidate records in document order.
+    """
+    results = []
+    tail = None
+    for page in pages:
+        buffer = page if tail is None else tail + "\n" + page
+        anchors = list(QUESTION_ANCHOR.finditer(buffer))
+        
+        # Every anchor but the last is closed by the one after it
+        for anchor, next_anchor in zip(anchors, anchors[1:]):
+            text = buffer[anchor.end():next_anchor.start()].strip()
+            results.append(QuestionCandidate(int(anchor.group(1)), text))
+        
+        if anchors:
+            tail = buffer[anchors[-1].start():]
+        else:
+            # The last line may be a number whose text starts on the next page
+            tail = buffer[buffer.rfind("\n") + 1:]
+    
+    if tail:
+        anchor = QUESTION_ANCHOR.match(tail)
+        if anchor:
+            results.append(QuestionCandidate(int(anchor.group(1)), tail[anchor.end():].strip()))
+    return results
+
+
+def extract_json_from_text(text: str):
+    """
+    Extract the first JSON object from a text block.
+    Balanced {...} regions are found in one scan, so fences and
+    surrounding prose need no special handling.
+    """
+    for candidate in iter_json_objects(text):
+        try:
+            return orjson.loads(candidate)
+        except orjson.JSONDecodeError:
+            continue
+    raise ValueError("Could not parse JSON from model response")
+
+
+def _post_with_retries(payload: dict, label: str, parse):
+    """
+    Send a chat completion request, retrying until parse accepts the reply.
+    
+    parse receives the message content and raises to reject it, so a
+    malformed answer is asked for again like any transient error.
+    """
     last_error = None
     for attempt in range(1, MAX_RETRIES + 1):
+        throttled = False
         try:
-            resp = requests.post(PPLX_ENDPOINT, headers=headers, json=payload, timeout=90)
+            RATE_LIMITER.acquire()
+            resp = SESSION.post(PPLX_ENDPOINT, json=payload, timeout=90)
+            if resp.status_code in THROTTLE_STATUSES:
+                # Hold every worker for as long as the server asks
+                throttled = True
+                RATE_LIMITER.pause_for(retry_after_seconds(resp.headers, ERROR_DELAY))
             if resp.status_code >= 400:
-                raise RuntimeError(f"HTTP {resp.status_code}: {resp.text[:300]}")
-            data = resp.json()
+                raise RuntimeError(f"HTTP {resp.status_code}: {resp.content[:300].decode('utf-8', 'replace')}")
+            data = orjson.loads(resp.content)
             content = data.get("choices", [{}])[0].get("message", {}).get("content", "")
-            obj = extract_json_from_text(content)
-            if isinstance(obj, dict):
-                # Ensure essential fields exist
-                obj.setdefault("id", f"neet_2024_phy_{question['number']:03d}")
-                obj.setdefault("questionNumber", question["number"])
-                obj.setdefault("questionText", question["text"])
-                return obj
-            raise ValueError("Model returned non-dict JSON")
+            return parse(content)
         except Exception as e:
             last_error = e
-            print(f"[Perplexity] Q{question['number']} attempt {attempt} failed: {e}")
-            time.sleep(ERROR_DELAY)
-        finally:
-            time.sleep(RATE_LIMIT_DELAY)
+            logger.warning(f"[Perplexity] {label} attempt {attempt} failed: {e}")
+            if not throttled:
+                time.sleep(min(MAX_ERROR_DELAY, ERROR_DELAY * 2 ** (attempt - 1)))
 
     raise RuntimeError(f"Perplexity call failed after {MAX_RETRIES} attempts: {last_error}")
 
 
-def main():
-    OUTPUT_PATH.parent.mkdir(parents=True, exist_ok=True)
-    print(f"Reading PDF: {PDF_PATH}")
-    raw_text = process_pdf(PDF_PATH)
-    print("Extracting question candidates...")
-    questions = extract_questions(raw_text)
-    print(f"Found {len(questions)} question candidates.")
+def _is_one_of(value, allowed: frozenset) -> bool:
+    return isinstance(value, str) and value in allowed
+
+
+def quick_check(item: dict) -> Optional[str]:
+    """
+    Check the item's id, enum and pattern fields without the full validator.
+    
+    Returns a description of the first problem found, or None. Passing
+    this does not make an item valid; it only catches common mistakes early.
+    """
+    item_id = item.get("id")
+    if not isinstance(item_id, str) or not ID_RE.search(item_id):
+        return f"id {item_id!r} does not match {ID_RE.pattern}"
+    if not _is_one_of(item.get("correctOption"), OPTION_IDS):
+        return f"correctOption {item.get('correctOption')!r} is not one of A-D"
+
+    exam_info = item.get("examInfo")
+    if isinstance(exam_info, dict) and not _is_one_of(exam_info.get("examType"), EXAM_TYPES):
+        return f"examInfo.examType {exam_info.get('examType')!r} is not allowed"
+
+    classification = item.get("classification")
+    if isinstance(classification, dict):
+        if not _is_one_of(classification.get("difficulty"), DIFFICULTIES):
+            return f"classification.difficulty {classification.get('difficulty')!r} is not allowed"
+        if not _is_one_of(classification.get("bloomsLevel"), BLOOMS_LEVELS):
+            return f"classification.bloomsLevel {classification.get('bloomsLevel')!r} is not allowed"
+
+    quick_method = item.get("quickMethod")
+    time_management = quick_method.get("timeManagement") if isinstance(quick_method, dict) else None
+    if isinstance(time_management, dict):
+        total_time = time_management.get("totalTime")
+        if not isinstance(total_time, str) or not TOTAL_TIME_RE.search(total_time):
+            return f"quickMethod.timeManagement.totalTime {total_time!r} does not match {TOTAL_TIME_RE.pattern}"
+    return None
+
+
+def complete_item(question: QuestionCandidate, obj: dict) -> dict:
+    """Fill in the essential fields of a structured question and validate it."""
+    obj.setdefault("id", f"neet_2024_phy_{question.number:03d}")
+    obj.setdefault("questionNumber", question.number)
+    obj.setdefault("questionText", question.text)
+    problem = quick_check(obj)
+    if problem is not None:
+        raise ValueError(f"Schema validation failed: {problem}")
+    error = next(ITEM_VALIDATOR.iter_errors(obj), None)
+    if error is not None:
+        raise ValueError(f"Schema validation failed at {list(error.path)}: {error.message}")
+    return obj
+
+
+def call_perplexity(question: QuestionCandidate, schema: dict, cache: Optional[ResponseCache] = None) -> dict:
+    """
+    Sends the question to Perplexity with instructions to produce JSON
+    conforming to the provided schema. Implements retry and rate limiting.
+    Results are served from and saved to cache when one is given.
+    """
+    user_prompt = USER_PROMPT_TEMPLATE.format(number=question.number, text=question.text)
+    payload = {
+        **PAYLOAD_BASE,
+        "messages": [SYSTEM_MESSAGE, {"role": "user", "content": user_prompt}]
+    }
+
+    # The key covers model, prompts and sampling, so editing any of them misses
+    cache_key = ResponseCache.key_for(payload)
+    if cache is not None:
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+    item = _post_with_retries(
+        payload,
+        f"Q{question.number}",
+        lambda content: complete_item(question, extract_json_from_text(content))
+    )
+    if cache is not None:
+        cache.put(cache_key, item)
+    return item
+
+
+def call_perplexity_batch(questions: list, cache: Optional[ResponseCache] = None) -> list:
+    """
+    Structure several questions with one Perplexity request.
+    
+    Returns the items in question order. Raises if the reply is missing a
+    question or any item fails validation; callers then fall back to
+    call_perplexity for each question.
+    """
+    listing = "\n\n".join(f"Question {q.number}: {q.text}" for q in questions)
+    user_prompt = BATCH_PROMPT_TEMPLATE.format(count=len(questions), questions=listing)
+    payload = {
+        **PAYLOAD_BASE,
+        "max_tokens": min(MAX_BATCH_TOKENS, MAX_ITEM_TOKENS * len(questions)),
+        "messages": [SYSTEM_MESSAGE, {"role": "user", "content": user_prompt}]
+    }
+
+    cache_key = ResponseCache.key_for(payload)
+    if cache is not None:
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached["items"]
+
+    numbers = [q.number for q in questions]
+    obj = _post_with_retries(payload, f"Q{numbers[0]}-Q{numbers[-1]}", extract_json_from_text)
+    # Candidate numbers can repeat, so replies sharing a number are
+    # matched to those questions in order
+    by_number = {}
+    for item in obj.get("items", []):
+        if isinstance(item, dict):
+            by_number.setdefault(item.get("questionNumber"), []).append(item)
+    replies = [by_number[n].pop(0) if by_number.get(n) else None for n in numbers]
+    missing = [n for n, item in zip(numbers, replies) if item is None]
+    if missing:
+        raise ValueError(f"Batch reply is missing questions {missing}")
+
+    items = [complete_item(q, item) for q, item in zip(questions, replies)]
+    if cache is not None:
+        cache.put(cache_key, {"items": items})
+    return items
+
+
+def fallback_item(q: QuestionCandidate) -> dict:
+    """Minimal schema-shaped item used when structuring a question fails."""
+    return {
+        "id": f"neet_2024_phy_{q.number:03d}",
+        "questionNumber": q.number,
+        "examInfo": {"year": 2024, "examType": "NEET", "paperCode": "2024-PHY"},
+        "title": f"Question {q.number}",
+        "questionText": q.text,
+        "options": [],
+        "correctOption": "A",
+        "classification": {
+            "subject": "Physics",
+            "chapter": "Unknown",
+            "topic": "Unknown",
+            "ncertClass": 12,
+            "difficulty": "Medium",
+            "estimatedTime": 3,
+            "conceptTags": ["physics"],
+            "bloomsLevel": "understand"
+        },
+        "stepByStep": [{"title": "Solution", "content": "Extraction failed"}]
+    }
+
 
+def structure_question(q: QuestionCandidate, idx: int, total: int, cache: Optional[ResponseCache] = None):
+    """Structure one question; returns (item, failed)."""
+    logger.info(f"Processing question {idx}/{total} (Q{q.number})...")
+    try:
+        item = call_perplexity(q, NEET_DB_SCHEMA, cache)
+        logger.info(f"✓ Successfully structured Q{q.number}")
+        return item, False
+    except Exception as e:
+        logger.error(f"✗ Error structuring Q{q.number}: {e}")
+        # Minimal fallback on failure
+        return fallback_item(q), True
+
+
+def structure_batch(batch: list, first_idx: int, total: int, cache: Optional[ResponseCache] = None):
+    """Structure a batch of questions; returns [(item, failed), ...] in order."""
+    if len(batch) == 1:
+        return [structure_question(batch[0], first_idx, total, cache)]
+
+    last_idx = first_idx + len(batch) - 1
+    logger.info(f"Processing questions {first_idx}-{last_idx}/{total} "
+                f"(Q{batch[0].number}-Q{batch[-1].number})...")
+    try:
+        items = call_perplexity_batch(batch, cache)
+        logger.info(f"✓ Successfully structured Q{batch[0].number}-Q{batch[-1].number}")
+        return [(item, False) for item in items]
+    except Exception as e:
+        logger.warning(f"✗ Batch Q{batch[0].number}-Q{batch[-1].number} failed ({e}); "
+                       f"structuring its questions one by one")
+        return [
+            structure_question(q, idx, total, cache)
+            for idx, q in enumerate(batch, first_idx)
+        ]
+
+
+def configure_client(api_key: str, concurrency: int):
+    """Set the API key on the shared session and size it and the rate limiter for concurrency."""
+    SESSION.headers["Authorization"] = f"Bearer {api_key}"
+    # Close the pool mounted by an earlier main() before replacing it
+    previous = SESSION.adapters.get("https://")
+    SESSION.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=concurrency, max_retries=0))
+    if previous is not None:
+        previous.close()
+    RATE_LIMITER.burst = max(1, concurrency)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Structure NEET questions with Perplexity')
+    parser.add_argument('--pdf', type=Path, default=PDF_PATH,
+                        help='Question paper PDF to extract from')
+    parser.add_argument('--out', type=Path, default=OUTPUT_PATH,
+                        help='Output JSON file; the checkpoint and cache are kept beside it')
+    parser.add_argument('-j', '--concurrency', type=int, default=MAX_CONCURRENCY,
+                        help='Perplexity requests in flight at once')
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE,
+                        help='Questions structured per request')
+    parser.add_argument('--api-key', default=os.getenv('PERPLEXITY_API_KEY'),
+                        help='Perplexity API key (default: PERPLEXITY_API_KEY)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Call the API for every question, ignoring cached responses')
+    parser.add_argument('--restart', action='store_true',
+                        help='Discard the checkpoint of earlier runs instead of resuming from it')
+    args = parser.parse_args(argv)
+    if not args.api_key:
+        parser.error("Set PERPLEXITY_API_KEY or pass --api-key")
+    if args.concurrency < 1 or args.batch_size < 1:
+        parser.error("--concurrency and --batch-size must be at least 1")
+
+    logging.basicConfig(
+        level=os.getenv("LOG_LEVEL", "INFO").upper(),
+        format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+
+    configure_client(args.api_key, args.concurrency)
+
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    logger.info(f"Reading PDF: {args.pdf}")
+    logger.info("Extracting question candidates...")
+    questions = extract_questions(iter_pages(args.pdf))
+    logger.info(f"Found {len(questions)} question candidates.")
+
+    # Each structured question is appended to the checkpoint as soon as its
+    # batch finishes, so an interrupted run resumes with only the rest.
+    # Entries are keyed by candidate index: question numbers can repeat.
+    # The header records the PDF and request settings the items came from,
+    # so indexes are never matched against another PDF's candidates
+    checkpoint_path = args.out.with_suffix(".ndjson")
+    source = checkpoint_source(
+        args.pdf,
+        model=PPLX_MODEL,
+        prompts=ResponseCache.key_for({
+            **PAYLOAD_BASE,
+            "system": SYSTEM_MESSAGE,
+            "user": USER_PROMPT_TEMPLATE,
+            "batch": BATCH_PROMPT_TEMPLATE
+        })
+    )
+    if args.restart:
+        checkpoint_path.unlink(missing_ok=True)
+    elif not checkpoint_matches(checkpoint_path, source):
+        parser.error(f"{checkpoint_path} was made from a different PDF or request settings; "
+                     f"pass --restart to discard it")
+    done = load_checkpoint(checkpoint_path, key="candidate").keys()
+    pending = [(idx, q) for idx, q in enumerate(questions) if idx not in done]
+    if done:
+        logger.info(f"Resuming: {len(done)} questions already in {checkpoint_path.name}")
+
+    cache = None if args.no_cache else ResponseCache(args.out.parent / CACHE_FILENAME)
+
+    # Several questions go in each request. API calls are I/O bound: keep up
+    # to --concurrency batches in flight and save each as it completes
+    batches = [pending[i:i + args.batch_size] for i in range(0, len(pending), args.batch_size)]
+    try:
+        with ThreadPoolExecutor(max_workers=args.concurrency) as executor, \
+                open_checkpoint(checkpoint_path, source) as checkpoint:
+            futures = {
+                executor.submit(
+                    structure_batch, [q for _, q in batch], i * args.batch_size + 1, len(pending), cache
+                ): batch
+                for i, batch in enumerate(batches)
+            }
+            for future in as_completed(futures):
+                for (idx, _), (item, failed) in zip(futures[future], future.result()):
+                    # Fallback items are not saved, so the next run retries them
+                    if not failed:
+                        append_checkpoint(checkpoint, {"candidate": idx, "item": item})
+    finally:
+        if cache is not None:
+            cache.close()
+
+    # Assemble the output from the checkpoint, in question order
+    saved = load_checkpoint(checkpoint_path, key="candidate")
     results = []
     failures = []
-
-    for idx, q in enumerate(questions, 1):
-        print(f"\nProcessing question {idx}/{len(questions)} (Q{q.get('number')})...")
-        try:
-            item = call_perplexity(q, NEET_DB_SCHEMA)
-            results.append(item)
-            print(f"✓ Successfully structured Q{q.get('number')}")
-        except Exception as e:
-            print(f"✗ Error structuring Q{q.get('number')}: {e}")
-            failures.append(q.get("number"))
-            # Minimal fallback on failure
-            results.append({
-                "id": f"neet_2024_phy_{q.get('number', 0):03d}",
-                "questionNumber": q.get("number"),
-                "examInfo": {"year": 2024, "examType": "NEET", "paperCode": "2024-PHY"},
-                "title": f"Question {q.get('number')}",
-                "questionText": q.get("text"),
-                "options": [],
-                "correctOption": "A",
-                "classification": {
-                    "subject": "Physics",
-                    "chapter": "Unknown",
-                    "topic": "Unknown",
-                    "ncertClass": 12,
-                    "difficulty": "Medium",
-                    "estimatedTime": 3,
-                    "conceptTags": ["physics"],
-                    "bloomsLevel": "understand"
-                },
-                "stepByStep": [{"title": "Solution", "content": "Extraction failed"}]
-            })
+    for idx, q in enumerate(questions):
+        if idx in saved:
+            results.append(saved[idx]["item"])
+        else:
+            results.append(fallback_item(q))
+            failures.append(q.number)
 
     dataset = {
         "metadata": {
@@ -382,24 +726,23 @@ def main():
         "questions": results
     }
 
-    print("\n" + "="*60)
-    print("Validating dataset against schema...")
+    logger.info("="*60)
+    logger.info("Validating dataset against schema...")
     try:
-        Draft7Validator(NEET_DB_SCHEMA).validate(dataset)
-        print("✓ Schema validation passed.")
+        DATASET_VALIDATOR.validate(dataset)
+        logger.info("✓ Schema validation passed.")
     except ValidationError as ve:
-        print("✗ Schema validation error (non-blocking):")
-        print(f"  Path: {list(ve.path)}")
-        print(f"  Message: {ve.message}")
+        logger.warning("✗ Schema validation error (non-blocking):")
+        logger.warning(f"  Path: {list(ve.path)}")
+        logger.warning(f"  Message: {ve.message}")
 
-    print(f"\nWriting output JSON: {OUTPUT_PATH}")
-    with OUTPUT_PATH.open("w", encoding="utf-8") as f:
-        json.dump(dataset, f, ensure_ascii=False, indent=2)
+    logger.info(f"Writing output JSON: {args.out}")
+    args.out.write_bytes(orjson.dumps(dataset, option=orjson.OPT_INDENT_2))
 
-    print("="*60)
-    print(f"✓ Done! Total items: {len(results)}. Failures: {len(failures)}")
+    logger.info("="*60)
+    logger.info(f"✓ Done! Total items: {len(results)}. Failures: {len(failures)}")
     if failures:
-        print(f"Failed question numbers: {failures[:20]}" + (" ..." if len(failures) > 20 else ""))
+        logger.warning(f"Failed question numbers: {failures[:20]}" + (" ..." if len(failures) > 20 else ""))
 
 
 if __name__ == "__main__":
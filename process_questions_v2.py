@@ -12,103 +12,46 @@ Major improvements:
 """
 
 import argparse
-import json
 import logging
+import os
+import shutil
+import tempfile
 import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Iterator, Optional, Tuple
 
+import orjson
 import requests
-from jsonschema import Draft7Validator
 
-from config import get_model_config, get_path_config, NEET_DB_SCHEMA
-from pdf_extractor import extract_physics_questions_improved
+from config import (
+    get_model_config,
+    get_path_config,
+    get_log_level,
+    NEET_DB_VALIDATOR,
+    NEET_QUESTION_VALIDATOR,
+)
+from pdf_extractor import Question, extract_physics_questions_improved
 from question_validator import is_valid_physics_question, validate_question_completeness
+from checkpoint import append_checkpoint, open_checkpoint
 from cost_tracker import CostTracker
+from json_extract import iter_json_objects
+from rate_limiter import AdaptiveConcurrency, SlidingWindowLimiter, retry_after_seconds
 
 
-# Setup logging
-def setup_logging(log_dir: Path):
-    """Configure logging to file and console."""
-    log_dir.mkdir(parents=True, exist_ok=True)
-    log_file = log_dir / f"processing_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
-    
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler(log_file),
-            logging.StreamHandler()
-        ]
-    )
-    return logging.getLogger(__name__)
-
-
-def extract_json_from_response(text: str) -> dict:
-    """Extract JSON from API response, handling code blocks and markdown."""
-    # Try to find JSON object
-    start = text.find('{')
-    end = text.rfind('}')
-    
-    if start != -1 and end != -1 and start < end:
-        json_str = text[start:end + 1]
-        try:
-            return json.loads(json_str)
-        except json.JSONDecodeError:
-            pass
-    
-    # Try code blocks
-    if '```' in text:
-        parts = text.split('```')
-        for part in parts:
-            part = part.strip()
-            if part.startswith('json'):
-                part = part[4:].strip()
-            if part.startswith('{') and part.endswith('}'):
-                try:
-                    return json.loads(part)
-                except json.JSONDecodeError:
-                    continue
-    
-    raise ValueError("Could not extract valid JSON from response")
-
-
-def call_perplexity_api(
-    question: dict,
-    model_config,
-    logger: logging.Logger,
-    cost_tracker: CostTracker
-) -> Optional[dict]:
-    """
-    Call Perplexity API to structure a question.
-    
-    Args:
-        question: Raw question dict with number and text
-        model_config: Model configuration
-        logger: Logger instance
-        cost_tracker: Cost tracking instance
-        
-    Returns:
-        Structured question dict or None on failure
-    """
-    headers = {
-        'Authorization': f'Bearer {model_config.api_key}',
-        'Content-Type': 'application/json'
-    }
-    
-    # Construct comprehensive prompt
-    user_prompt = f"""You are a NEET question formatter. Convert this Physics question into structured JSON.
+# Static parts of every request, built once at import
+SYSTEM_MESSAGE = {
+    'role': 'system',
+    'content': 'You are an expert NEET Physics question analyzer. Return only valid JSON matching the schema exactly. Use your physics knowledge to identify correct answers and provide detailed solutions.'
+}
 
-Question {question['number']}: {question.get('question_text', question['text'])}
-
-EXTRACTED OPTIONS:
-{json.dumps(question.get('options', []), indent=2)}
-
-Return a JSON object with this EXACT structure:
-{{
-  "id": "neet_2024_phy_{question['number']:03d}",
-  "questionNumber": {question['number']},
+# Structure of one structured question; {item_id} and {item_number} are
+# filled with the real values for one question, or with a description for many
+ITEM_STRUCTURE = """{{
+  "id": "{item_id}",
+  "questionNumber": {item_number},
   "examInfo": {{
     "year": 2024,
     "examType": "NEET",
@@ -157,9 +100,9 @@ Return a JSON object with this EXACT structure:
   }},
   "questionImages": [],
   "solutionImages": []
-}}
+}}"""
 
-CRITICAL REQUIREMENTS:
+REQUIREMENTS = """CRITICAL REQUIREMENTS:
 1. Identify the CORRECT answer based on physics principles
 2. Provide detailed analysis for EACH option
 3. Use real NCERT chapter names (e.g., "Electrostatics", "Motion in a Plane")
@@ -169,59 +112,157 @@ CRITICAL REQUIREMENTS:
 
 Return ONLY valid JSON. No additional text."""
 
-    payload = {
-        'model': model_config.model_name,
-        'messages': [
-            {
-                'role': 'system',
-                'content': 'You are an expert NEET Physics question analyzer. Return only valid JSON matching the schema exactly. Use your physics knowledge to identify correct answers and provide detailed solutions.'
-            },
-            {
-                'role': 'user',
-                'content': user_prompt
-            }
-        ],
-        'temperature': model_config.temperature,
-        'max_tokens': model_config.max_tokens
-    }
+# Filled in per call with str.format; literal braces are doubled
+USER_PROMPT_TEMPLATE = """You are a NEET question formatter. Convert this Physics question into structured JSON.
+
+Question {number}: {question_text}
+
+EXTRACTED OPTIONS:
+{options_json}
+
+Return a JSON object with this EXACT structure:
+""" + ITEM_STRUCTURE + "\n\n" + REQUIREMENTS
+
+BATCH_PROMPT_TEMPLATE = """You are a NEET question formatter. Process the following {count} Physics questions and convert each into structured JSON.
+
+{questions}
+
+Return a JSON object {{"results": [...]}} with one object per question, in the order given. Each object has this EXACT structure:
+""" + ITEM_STRUCTURE + "\n\n" + REQUIREMENTS
+
+# One question of a batch prompt, options compact to keep the prompt short
+BATCH_QUESTION_TEMPLATE = """Question {number}: {question_text}
+OPTIONS: {options_json}"""
+
+# Output budget cap for a whole batch call, however many questions it holds
+MAX_BATCH_TOKENS = 8192
+
+# Merges of this many batch files or more are prepared by worker processes
+PARALLEL_MIN_BATCHES = 8
+
+
+# Setup logging
+def setup_logging(log_dir: Path):
+    """Configure logging to file and console."""
+    log_dir.mkdir(parents=True, exist_ok=True)
+    log_file = log_dir / f"processing_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
     
+    logging.basicConfig(
+        level=get_log_level(),
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler(log_file),
+            logging.StreamHandler()
+        ]
+    )
+    return logging.getLogger(__name__)
+
+
+def extract_json_from_response(text: str) -> dict:
+    """Extract JSON from API response, handling code blocks and markdown."""
+    # Steady-state replies are a bare JSON object, or one in a single code
+    # block: unwrap the block and parse the object as-is
+    stripped = text.strip()
+    if stripped.startswith('```') and stripped.endswith('```'):
+        stripped = stripped[3:-3].removeprefix('json').strip()
+    if stripped.startswith('{') and stripped.endswith('}'):
+        try:
+            return orjson.loads(stripped)
+        except orjson.JSONDecodeError:
+            pass
+    
+    # Otherwise take the first balanced object that parses, in one pass
+    for candidate in iter_json_objects(text):
+        try:
+            return orjson.loads(candidate)
+        except orjson.JSONDecodeError:
+            continue
+    
+    raise ValueError("Could not extract valid JSON from response")
+
+
+def create_session(model_config) -> requests.Session:
+    """
+    Create a keep-alive session carrying the API auth headers.
+    
+    The connection pool is sized for MAX_CONCURRENCY workers, so each
+    worker reuses an open TLS connection instead of reconnecting per call.
+    Retries stay in call_perplexity_api, so the adapter never retries itself.
+    """
+    session = requests.Session()
+    session.headers.update({
+        'Authorization': f'Bearer {model_config.api_key}',
+        'Content-Type': 'application/json'
+    })
+    adapter = requests.adapters.HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=model_config.concurrency,
+        max_retries=0
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def _post_chat(
+    payload: dict,
+    estimated_tokens: int,
+    model_config,
+    logger: logging.Logger,
+    cost_tracker: CostTracker,
+    concurrency: AdaptiveConcurrency,
+    rate_limiter: SlidingWindowLimiter,
+    session: requests.Session
+) -> Optional[dict]:
+    """
+    Send a chat completion request, retrying until its reply parses as JSON.
+    
+    Returns:
+        JSON object extracted from the reply, or None once retries run out
+    """
     last_error = None
     for attempt in range(1, model_config.max_retries + 1):
+        retry_delay = model_config.error_delay
         try:
             logger.info(f"  API call attempt {attempt}/{model_config.max_retries}")
             
-            response = requests.post(
-                f"{model_config.base_url}/chat/completions",
-                headers=headers,
-                json=payload,
-                timeout=90
-            )
+            # Wait for budget before taking a slot, so waiting holds no slot
+            rate_limiter.acquire(estimated_tokens)
+            with concurrency.slot():
+                started = time.monotonic()
+                try:
+                    response = session.post(
+                        f"{model_config.base_url}/chat/completions",
+                        json=payload,
+                        timeout=90
+                    )
+                except requests.RequestException:
+                    concurrency.record(time.monotonic() - started, overloaded=True)
+                    raise
+            
+            overloaded = response.status_code == 429 or response.status_code >= 500
+            concurrency.record(time.monotonic() - started, overloaded=overloaded)
+            if response.status_code == 429:
+                retry_delay = retry_after_seconds(response.headers, model_config.error_delay)
             
             if response.status_code >= 400:
-                error_msg = response.text[:300]
+                # Only the logged head of the body is decoded
+                error_msg = response.content[:300].decode('utf-8', errors='replace')
                 logger.error(f"  HTTP {response.status_code}: {error_msg}")
                 raise RuntimeError(f"API error: {error_msg}")
             
-            data = response.json()
+            data = orjson.loads(response.content)
             content = data.get('choices', [{}])[0].get('message', {}).get('content', '')
             
             # Extract token usage if available
             usage = data.get('usage', {})
-            input_tokens = usage.get('prompt_tokens', cost_tracker.estimate_tokens_from_text(user_prompt))
+            input_tokens = usage.get('prompt_tokens', estimated_tokens)
             output_tokens = usage.get('completion_tokens', cost_tracker.estimate_tokens_from_text(content))
             
             cost_tracker.record_call(input_tokens, output_tokens, success=True)
             
             # Parse JSON response
-            result = extract_json_from_response(content)
-            
-            # Ensure required fields
-            result.setdefault('id', f"neet_2024_phy_{question['number']:03d}")
-            result.setdefault('questionNumber', question['number'])
-            result.setdefault('questionText', question.get('question_text', question['text']))
-            
-            logger.info(f"  ✅ Successfully parsed response")
-            return result
+            return extract_json_from_response(content)
             
         except Exception as e:
             last_error = e
@@ -229,38 +270,199 @@ Return ONLY valid JSON. No additional text."""
             cost_tracker.record_call(0, 0, success=False)
             
             if attempt < model_config.max_retries:
-                time.sleep(model_config.error_delay)
-        finally:
-            # Rate limiting
-            time.sleep(model_config.rate_limit_delay)
+                time.sleep(retry_delay)
     
     logger.error(f"  ⛔ All retries exhausted. Last error: {last_error}")
     return None
 
 
-def load_progress(progress_file: Path) -> dict:
-    """Load processing progress from file."""
-    if progress_file.exists():
-        with open(progress_file, 'r') as f:
-            return json.load(f)
+def _complete_result(result: dict, question: Question) -> dict:
+    """Fill the fields every structured question must carry."""
+    result.setdefault('id', f"neet_2024_phy_{question.number:03d}")
+    result.setdefault('questionNumber', question.number)
+    result.setdefault('questionText', question.question_text)
+    return result
+
+
+def call_perplexity_api(
+    question: Question,
+    model_config,
+    logger: logging.Logger,
+    cost_tracker: CostTracker,
+    concurrency: AdaptiveConcurrency,
+    rate_limiter: SlidingWindowLimiter,
+    session: requests.Session
+) -> Optional[dict]:
+    """
+    Call Perplexity API to structure a question.
+    
+    Args:
+        question: Extracted question record
+        model_config: Model configuration
+        logger: Logger instance
+        cost_tracker: Cost tracking instance
+        concurrency: Shared cap on requests in flight, adapted to API load
+        rate_limiter: Shared per-minute request and token budget
+        session: Pooled HTTP session from create_session
+        
+    Returns:
+        Structured question dict or None on failure
+    """
+    user_prompt = USER_PROMPT_TEMPLATE.format(
+        number=question.number,
+        question_text=question.question_text,
+        options_json=orjson.dumps(question.options, option=orjson.OPT_INDENT_2).decode(),
+        item_id=f"neet_2024_phy_{question.number:03d}",
+        item_number=question.number
+    )
+    
+    payload = {
+        'model': model_config.model_name,
+        'messages': [
+            SYSTEM_MESSAGE,
+            {
+                'role': 'user',
+                'content': user_prompt
+            }
+        ],
+        'temperature': model_config.temperature,
+        'max_tokens': model_config.max_tokens
+    }
+    estimated_tokens = cost_tracker.estimate_tokens_from_text(user_prompt)
+    
+    result = _post_chat(payload, estimated_tokens, model_config, logger, cost_tracker,
+                        concurrency, rate_limiter, session)
+    if result is None:
+        return None
+    
+    logger.info(f"  ✅ Successfully parsed response")
+    return _complete_result(result, question)
+
+
+def call_perplexity_api_batch(
+    questions_batch: List[Question],
+    model_config,
+    logger: logging.Logger,
+    cost_tracker: CostTracker,
+    concurrency: AdaptiveConcurrency,
+    rate_limiter: SlidingWindowLimiter,
+    session: requests.Session
+) -> List[Optional[dict]]:
+    """
+    Structure several questions with one Perplexity API call.
+    
+    The system prompt and item structure are sent once for the whole
+    batch instead of once per question. Results are matched back to the
+    questions by questionNumber; any question the reply misses is sent on
+    its own instead.
+    
+    Args:
+        questions_batch: Extracted question records
+        (other args as for call_perplexity_api)
+        
+    Returns:
+        Structured question dict or None per question, in order
+    """
+    if len(questions_batch) == 1:
+        return [call_perplexity_api(questions_batch[0], model_config, logger, cost_tracker,
+                                    concurrency, rate_limiter, session)]
+    
+    first, last = questions_batch[0].number, questions_batch[-1].number
+    listing = "\n\n".join(
+        BATCH_QUESTION_TEMPLATE.format(
+            number=q.number,
+            question_text=q.question_text,
+            options_json=orjson.dumps(q.options).decode()
+        )
+        for q in questions_batch
+    )
+    user_prompt = BATCH_PROMPT_TEMPLATE.format(
+        count=len(questions_batch),
+        questions=listing,
+        item_id='neet_2024_phy_ followed by the 3-digit question number',
+        item_number='the question number'
+    )
+    
+    payload = {
+        'model': model_config.model_name,
+        'messages': [
+            SYSTEM_MESSAGE,
+            {
+                'role': 'user',
+                'content': user_prompt
+            }
+        ],
+        'temperature': model_config.temperature,
+        'max_tokens': min(MAX_BATCH_TOKENS, model_config.max_tokens * len(questions_batch))
+    }
+    estimated_tokens = cost_tracker.estimate_tokens_from_text(user_prompt)
+    
+    logger.info(f"  📦 Structuring Q{first}-Q{last} in one call")
+    reply = _post_chat(payload, estimated_tokens, model_config, logger, cost_tracker,
+                       concurrency, rate_limiter, session)
+    results = reply.get('results') if reply is not None else None
+    
+    # Results sharing a number go to the questions with that number in order
+    by_number = {}
+    for result in results if isinstance(results, list) else []:
+        if isinstance(result, dict):
+            by_number.setdefault(result.get('questionNumber'), []).append(result)
+    matched = [by_number[q.number].pop(0) if by_number.get(q.number) else None for q in questions_batch]
+    
+    missing = [q.number for q, result in zip(questions_batch, matched) if result is None]
+    if missing:
+        logger.warning(f"  ⚠️  Batch reply for Q{first}-Q{last} is missing {missing}, sending those one by one")
+    else:
+        logger.info(f"  ✅ Successfully parsed Q{first}-Q{last}")
+    
+    return [
+        _complete_result(result, q) if result is not None
+        else call_perplexity_api(q, model_config, logger, cost_tracker, concurrency, rate_limiter, session)
+        for q, result in zip(questions_batch, matched)
+    ]
+
+
+def new_progress() -> dict:
+    """Progress state of a run that has not completed any batch."""
     return {
         'last_completed_batch': -1,
         'next_question_index': 0,
-        'processed_question_ids': []
+        'processed_question_ids': set()
     }
 
 
-def save_progress(progress_file: Path, progress: dict):
-    """Save processing progress to file."""
-    with open(progress_file, 'w') as f:
-        json.dump(progress, f, indent=2)
+def load_progress(progress_file: Path) -> dict:
+    """
+    Rebuild processing progress by replaying the progress event log.
+    
+    A line cut short by a crash mid-write is skipped.
+    """
+    progress = new_progress()
+    if not progress_file.exists():
+        return progress
+    
+    with open(progress_file, 'rb') as f:
+        for line in f:
+            try:
+                event = orjson.loads(line)
+            except orjson.JSONDecodeError:
+                continue
+            progress['last_completed_batch'] = event['batch']
+            progress['next_question_index'] = event['next_question_index']
+            progress['processed_question_ids'].update(event['processed'])
+    return progress
+
+
+def append_progress_event(progress_file: Path, event: dict):
+    """Append one completed-batch event to the progress log."""
+    with open_checkpoint(progress_file) as f:
+        append_checkpoint(f, event)
 
 
 def save_batch(batch_dir: Path, batch_num: int, questions: List[dict]):
     """Save a batch of processed questions."""
     batch_file = batch_dir / f"batch_{batch_num:04d}.json"
-    with open(batch_file, 'w', encoding='utf-8') as f:
-        json.dump(questions, f, ensure_ascii=False, indent=2)
+    batch_file.write_bytes(orjson.dumps(questions, option=orjson.OPT_INDENT_2))
 
 
 def log_failed_question(failed_log: Path, question_num: int, reason: str):
@@ -271,11 +473,12 @@ def log_failed_question(failed_log: Path, question_num: int, reason: str):
 
 
 def process_questions_in_batches(
-    questions: List[dict],
+    questions: List[Question],
     model_config,
     path_config,
     logger: logging.Logger,
     batch_size: int = 10,
+    questions_per_call: int = 5,
     resume: bool = True,
     dry_run: bool = False
 ) -> List[dict]:
@@ -283,11 +486,12 @@ def process_questions_in_batches(
     Process questions in batches with progress tracking.
     
     Args:
-        questions: List of raw question dicts
+        questions: List of extracted question records
         model_config: Model configuration
         path_config: Path configuration
         logger: Logger instance
         batch_size: Number of questions per batch
+        questions_per_call: Questions structured by each API call
         resume: Whether to resume from previous progress
         dry_run: If True, skip API calls (testing only)
         
@@ -298,80 +502,109 @@ def process_questions_in_batches(
     all_results = []
     
     # Load progress
-    progress = load_progress(path_config.progress_file) if resume else {
-        'last_completed_batch': -1,
-        'next_question_index': 0,
-        'processed_question_ids': []
-    }
+    if resume:
+        progress = load_progress(path_config.progress_file)
+    else:
+        progress = new_progress()
+        path_config.progress_file.unlink(missing_ok=True)
     
     start_idx = progress['next_question_index']
     logger.info(f"📦 Processing from question index {start_idx}")
     
-    # Process in batches
-    for batch_num, i in enumerate(range(start_idx, len(questions), batch_size)):
-        actual_batch_num = progress['last_completed_batch'] + 1 + batch_num
-        batch = questions[i:i + batch_size]
-        
-        logger.info(f"\n{'='*60}")
-        logger.info(f"🔄 Processing Batch {actual_batch_num} ({len(batch)} questions)")
-        logger.info(f"{'='*60}")
-        
-        batch_results = []
-        
-        for q in batch:
-            q_num = q['number']
-            logger.info(f"\n📝 Processing Q{q_num}")
-            
-            # Skip if already processed
-            if q_num in progress['processed_question_ids']:
-                logger.info(f"  ⏭️  Already processed, skipping")
-                continue
+    # API calls are I/O bound: up to model_config.concurrency questions of a
+    # batch are structured at once, fewer while the API is struggling
+    concurrency = AdaptiveConcurrency(model_config.concurrency)
+    # Requests average one per rate_limit_delay over each minute
+    rate_limiter = SlidingWindowLimiter(
+        60.0 / model_config.rate_limit_delay if model_config.rate_limit_delay > 0 else 0,
+        model_config.tokens_per_minute
+    )
+    with create_session(model_config) as session, \
+            ThreadPoolExecutor(max_workers=model_config.concurrency) as executor:
+        # Process in batches
+        for batch_num, i in enumerate(range(start_idx, len(questions), batch_size)):
+            actual_batch_num = progress['last_completed_batch'] + 1 + batch_num
+            batch = questions[i:i + batch_size]
             
-            # Validate question
-            if not is_valid_physics_question(q['text']):
-                logger.warning(f"  ⚠️  Invalid physics question, skipping")
-                log_failed_question(path_config.failed_log, q_num, "Invalid physics content")
-                continue
+            logger.info(f"\n{'='*60}")
+            logger.info(f"🔄 Processing Batch {actual_batch_num} ({len(batch)} questions)")
+            logger.info(f"{'='*60}")
             
-            if dry_run:
-                logger.info(f"  🧪 DRY RUN - Skipping API call")
-                continue
+            batch_results = []
+            batch_ids = []
+            pending = []
             
-            # Call API
-            structured = call_perplexity_api(q, model_config, logger, cost_tracker)
+            for q in batch:
+                q_num = q.number
+                logger.info(f"\n📝 Processing Q{q_num}")
+                
+                # Skip if already processed
+                if q_num in progress['processed_question_ids']:
+                    logger.info(f"  ⏭️  Already processed, skipping")
+                    continue
+                
+                # Validate question
+                if not is_valid_physics_question(q.question_text):
+                    logger.warning(f"  ⚠️  Invalid physics question, skipping")
+                    log_failed_question(path_config.failed_log, q_num, "Invalid physics content")
+                    continue
+                
+                if dry_run:
+                    logger.info(f"  🧪 DRY RUN - Skipping API call")
+                    continue
+                
+                pending.append(q)
             
-            if not structured:
-                logger.error(f"  ❌ API call failed")
-                log_failed_question(path_config.failed_log, q_num, "API call failed")
-                continue
+            # Pack questions_per_call questions into each API call and run the
+            # calls concurrently; results come back in question order
+            groups = [pending[j:j + questions_per_call] for j in range(0, len(pending), questions_per_call)]
+            responses = executor.map(
+                lambda group: call_perplexity_api_batch(
+                    group, model_config, logger, cost_tracker, concurrency, rate_limiter, session
+                ),
+                groups
+            )
             
-            # Validate completeness
-            is_valid, errors = validate_question_completeness(structured)
+            for q, structured in zip(pending, (r for group_results in responses for r in group_results)):
+                q_num = q.number
+                
+                if not structured:
+                    logger.error(f"  ❌ API call failed")
+                    log_failed_question(path_config.failed_log, q_num, "API call failed")
+                    continue
+                
+                # Validate completeness
+                is_valid, errors = validate_question_completeness(structured, fast_fail=True)
+                
+                if not is_valid:
+                    logger.warning(f"  ⚠️  Validation failed: {errors[0]}")
+                    log_failed_question(path_config.failed_log, q_num, f"Validation: {errors[0]}")
+                    # Still add it but log the issues
+                
+                batch_results.append(structured)
+                batch_ids.append(q_num)
+                progress['processed_question_ids'].add(q_num)
+                all_results.append(structured)
+                
+                logger.info(f"  ✅ Successfully processed Q{q_num}")
             
-            if not is_valid:
-                logger.warning(f"  ⚠️  Validation failed: {'; '.join(errors[:3])}")
-                log_failed_question(path_config.failed_log, q_num, f"Validation: {errors[0]}")
-                # Still add it but log the issues
+            # Save batch
+            if batch_results and not dry_run:
+                save_batch(path_config.batches_dir, actual_batch_num, batch_results)
+                logger.info(f"\n💾 Saved batch {actual_batch_num} ({len(batch_results)} questions)")
             
-            batch_results.append(structured)
-            progress['processed_question_ids'].append(q_num)
-            all_results.append(structured)
+            # Update progress
+            progress['last_completed_batch'] = actual_batch_num
+            progress['next_question_index'] = min(i + batch_size, len(questions))
+            append_progress_event(path_config.progress_file, {
+                'batch': actual_batch_num,
+                'next_question_index': progress['next_question_index'],
+                'processed': batch_ids
+            })
             
-            logger.info(f"  ✅ Successfully processed Q{q_num}")
-        
-        # Save batch
-        if batch_results and not dry_run:
-            save_batch(path_config.batches_dir, actual_batch_num, batch_results)
-            logger.info(f"\n💾 Saved batch {actual_batch_num} ({len(batch_results)} questions)")
-        
-        # Update progress
-        progress['last_completed_batch'] = actual_batch_num
-        progress['next_question_index'] = min(i + batch_size, len(questions))
-        save_progress(path_config.progress_file, progress)
+            # Print cost summary so far
+            logger.info(f"\n💰 Cost so far: ${cost_tracker.estimate_cost():.4f}")
         
-        # Print cost summary so far
-        logger.info(f"\n💰 Cost so far: ${cost_tracker.estimate_cost():.4f}")
-    
     logger.info(f"\n{'='*60}")
     logger.info(f"✅ Batch processing complete!")
     logger.info(f"{'='*60}")
@@ -381,51 +614,110 @@ def process_questions_in_batches(
     return all_results
 
 
-def merge_batches(batches_dir: Path, output_path: Path, logger: logging.Logger):
-    """Merge all batch files into final output."""
+def _indented_json(obj, depth: int) -> bytes:
+    """Serialize obj with 2-space indentation, as if nested `depth` levels deep."""
+    pad = b'\n' + b'  ' * depth
+    return orjson.dumps(obj, option=orjson.OPT_INDENT_2).replace(b'\n', pad)
+
+
+def _prepare_batch(batch_file: Path) -> List[Tuple[Optional[str], Optional[str], bytes]]:
+    """Worker: parse a batch file, then validate and serialize each question in it."""
+    prepared = []
+    for q in orjson.loads(batch_file.read_bytes()):
+        error = next(NEET_QUESTION_VALIDATOR.iter_errors(q), None)
+        prepared.append((q.get('id'), error and error.message, _indented_json(q, 2)))
+    return prepared
+
+
+def _iter_prepared_batches(batch_files: List[Path]) -> Iterator[List[Tuple[Optional[str], Optional[str], bytes]]]:
+    """
+    Yield the prepared questions of each batch file, in file order.
+    
+    Parsing and schema validation hold the GIL, so merges of
+    PARALLEL_MIN_BATCHES files or more prepare them in worker processes,
+    at most two files per worker ahead of the caller.
+    """
+    workers = min(os.cpu_count() or 1, len(batch_files))
+    if len(batch_files) < PARALLEL_MIN_BATCHES or workers < 2:
+        for batch_file in batch_files:
+            yield _prepare_batch(batch_file)
+        return
+    
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        ahead = deque()
+        for batch_file in batch_files:
+            ahead.append(executor.submit(_prepare_batch, batch_file))
+            if len(ahead) >= 2 * workers:
+                yield ahead.popleft().result()
+        while ahead:
+            yield ahead.popleft().result()
+
+
+def merge_batches(batches_dir: Path, output_path: Path, logger: logging.Logger) -> dict:
+    """
+    Merge all batch files into final output.
+    
+    Batch files are parsed, validated and serialized a few at a time by
+    _iter_prepared_batches, and each new question is written out as soon
+    as its file is ready, so memory use does not grow with the dataset.
+    
+    Returns:
+        Metadata of the merged dataset
+    """
     logger.info("\n🔗 Merging batch files...")
     
-    batch_files = sorted(batches_dir.glob("batch_*.json"))
-    all_questions = []
+    # One directory read; batch names are zero-padded, so name order is batch order
+    with os.scandir(batches_dir) as entries:
+        batch_files = sorted(
+            Path(entry.path) for entry in entries
+            if entry.name.startswith('batch_') and entry.name.endswith('.json') and entry.is_file()
+        )
     seen_ids = set()
+    schema_errors = 0
     
-    for batch_file in batch_files:
-        with open(batch_file, 'r', encoding='utf-8') as f:
-            batch_questions = json.load(f)
-            
-        for q in batch_questions:
-            q_id = q.get('id')
-            if q_id and q_id not in seen_ids:
-                all_questions.append(q)
+    # totalQuestions leads the file but is only known at the end, so the
+    # questions are staged in a scratch file and copied in after the metadata
+    with tempfile.TemporaryFile(dir=output_path.parent) as staged:
+        for prepared in _iter_prepared_batches(batch_files):
+            for q_id, error, serialized in prepared:
+                if not q_id or q_id in seen_ids:
+                    continue
                 seen_ids.add(q_id)
-    
-    # Create final dataset
-    dataset = {
-        'metadata': {
+                
+                if error is not None:
+                    schema_errors += 1
+                    logger.warning(f"⚠️  Schema validation warning ({q_id}): {error}")
+                
+                staged.write(b',\n    ' if len(seen_ids) > 1 else b'\n    ')
+                staged.write(serialized)
+        
+        metadata = {
             'version': '2.0',
             'lastUpdated': datetime.now().isoformat(),
-            'totalQuestions': len(all_questions),
+            'totalQuestions': len(seen_ids),
             'subject': 'Physics',
             'yearRange': '2024-2024',
             'processingMethod': 'Enhanced extraction with validation'
-        },
-        'questions': all_questions
-    }
-    
-    # Validate schema
-    try:
-        Draft7Validator(NEET_DB_SCHEMA).validate(dataset)
-        logger.info("✅ Schema validation passed")
-    except Exception as e:
-        logger.warning(f"⚠️  Schema validation warning: {e}")
-    
-    # Write output
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(dataset, f, ensure_ascii=False, indent=2)
+        }
+        
+        # Validate the metadata; questions were checked one by one above
+        try:
+            NEET_DB_VALIDATOR.validate({'metadata': metadata, 'questions': []})
+            if not schema_errors:
+                logger.info("✅ Schema validation passed")
+        except Exception as e:
+            logger.warning(f"⚠️  Schema validation warning: {e}")
+        
+        # Write output, laid out as json.dump(indent=2) would
+        staged.seek(0)
+        with open(output_path, 'wb') as f:
+            f.write(b'{\n  "metadata": ' + _indented_json(metadata, 1) + b',\n  "questions": [')
+            shutil.copyfileobj(staged, f)
+            f.write(b'\n  ]\n}' if seen_ids else b']\n}')
     
-    logger.info(f"✅ Merged {len(all_questions)} questions to {output_path}")
+    logger.info(f"✅ Merged {len(seen_ids)} questions to {output_path}")
     
-    return dataset
+    return metadata
 
 
 def main():
@@ -449,6 +741,12 @@ def main():
         default=10,
         help='Number of questions per batch (default: 10)'
     )
+    parser.add_argument(
+        '--questions-per-call',
+        type=int,
+        default=5,
+        help='Questions structured by each API call (default: 5)'
+    )
     parser.add_argument(
         '--resume',
         action='store_true',
@@ -498,6 +796,7 @@ def main():
     logger.info(f"PDF: {path_config.pdf_path}")
     logger.info(f"Output: {path_config.output_path}")
     logger.info(f"Batch size: {args.batch_size}")
+    logger.info(f"Questions per call: {args.questions_per_call}")
     logger.info(f"Resume: {args.resume}")
     logger.info(f"Dry run: {args.dry_run}")
     logger.info("="*60)
@@ -510,7 +809,7 @@ def main():
         if args.start_question or args.end_question:
             start = args.start_question or 0
             end = args.end_question or float('inf')
-            questions = [q for q in questions if start <= q['number'] <= end]
+            questions = [q for q in questions if start <= q.number <= end]
             logger.info(f"📌 Filtered to questions {start}-{end}: {len(questions)} questions")
         
         if not questions:
@@ -529,20 +828,21 @@ def main():
             path_config,
             logger,
             batch_size=args.batch_size,
+            questions_per_call=max(1, args.questions_per_call),
             resume=args.resume,
             dry_run=args.dry_run
         )
         
         if not args.dry_run:
             # Merge batches into final output
-            final_dataset = merge_batches(
+            final_metadata = merge_batches(
                 path_config.batches_dir,
                 path_config.output_path,
                 logger
             )
             
             logger.info(f"\n🎉 Processing complete!")
-            logger.info(f"📊 Total valid questions: {len(final_dataset['questions'])}")
+            logger.info(f"📊 Total valid questions: {final_metadata['totalQuestions']}")
             logger.info(f"📁 Output: {path_config.output_path}")
         else:
             logger.info(f"\n🧪 Dry run complete - no API calls made")
@@ -5,9 +5,21 @@ Filters invalid content and validates question completeness.
 """
 
 import re
-from typing import Tuple, List
+from typing import Iterator, List, Tuple
 
-from config import INVALID_PATTERNS, PLACEHOLDER_PATTERNS
+from config import INVALID_LOWER_RE, INVALID_RE, PLACEHOLDER_RE, PLACEHOLDER_PATTERNS
+
+
+# Physics questions typically contain one of these markers (case-sensitive)
+_QUESTION_MARKER_RE = re.compile(r'\?|calculate|find|determine|if|when')
+
+# Instructions often open with an imperative verb
+_INSTRUCTION_START_RE = re.compile(r'\s*(?:read|fill|write|darken|use only|do not|ensure)', re.I)
+
+# Fields a structured question cannot do without
+_REQUIRED_FIELDS = ('id', 'questionText', 'options', 'correctOption', 'classification')
+
+_OPTION_IDS = frozenset('ABCD')
 
 
 def is_valid_physics_question(text: str) -> bool:
@@ -25,113 +37,116 @@ def is_valid_physics_question(text: str) -> bool:
     if not text or len(text.strip()) < 20:
         return False
     
-    text_lower = text.lower()
-    
-    # Check against invalid patterns
-    for pattern in INVALID_PATTERNS:
-        if pattern.search(text):
-            return False
-    
     # Additional heuristic checks
-    # Questions should have some substance
-    words = text.split()
-    if len(words) < 10:
+    # Questions should have some substance; at most 10 pieces are split off
+    if len(text.split(None, 9)) < 10:
         return False
     
-    # Physics questions typically contain certain markers
-    # but instructions don't have these
-    has_question_markers = any(marker in text for marker in ['?', 'calculate', 'find', 'determine', 'if', 'when'])
-    
-    # Instructions often have imperative verbs
-    instruction_verbs = ['read', 'fill', 'write', 'darken', 'use only', 'do not', 'ensure']
-    starts_with_instruction = any(text_lower.strip().startswith(verb) for verb in instruction_verbs)
+    # Check against invalid patterns. Non-ASCII text keeps the IGNORECASE
+    # scan, since re.I also folds characters like 'ſ' that lower() keeps.
+    if INVALID_LOWER_RE.search(text.lower()) if text.isascii() else INVALID_RE.search(text):
+        return False
     
-    if starts_with_instruction and not has_question_markers:
+    # Text opening like an instruction is rejected unless it also carries
+    # a question marker, which instructions don't have. Each check is one
+    # precompiled scan, and the marker scan only runs when needed.
+    if _INSTRUCTION_START_RE.match(text) and not _QUESTION_MARKER_RE.search(text):
         return False
     
     return True
 
 
-def validate_question_completeness(question: dict) -> Tuple[bool, List[str]]:
+def _iter_errors(question: dict) -> Iterator[str]:
     """
-    Validate that a structured question contains complete and valid data.
+    Yield the problems of a structured question, cheapest checks first.
     
-    Args:
-        question: Structured question dictionary
-        
-    Returns:
-        Tuple of (is_valid: bool, error_reasons: List[str])
+    Key lookups and length checks come before the option and tag scans,
+    and the placeholder regex comes last, so a caller that stops at the
+    first error rarely pays for the expensive checks.
     """
-    errors = []
-    
     # Check required fields exist
-    required_fields = ['id', 'questionText', 'options', 'correctOption', 'classification']
-    for field in required_fields:
-        if field not in question:
-            errors.append(f"Missing required field: {field}")
-    
-    if errors:
-        return False, errors
-    
-    # Validate question text
-    question_text = question.get('questionText', '')
-    if len(question_text) < 50:
-        errors.append(f"Question text too short: {len(question_text)} chars")
+    missing = [field for field in _REQUIRED_FIELDS if field not in question]
+    if missing:
+        for field in missing:
+            yield f"Missing required field: {field}"
+        return
     
-    # Check for placeholder content
-    text_lower = question_text.lower()
-    for pattern in PLACEHOLDER_PATTERNS:
-        if re.search(pattern, text_lower):
-            errors.append(f"Found placeholder pattern: {pattern}")
-            break
+    # Validate correct option
+    correct_option = question.get('correctOption')
+    if correct_option not in _OPTION_IDS:
+        yield f"Invalid correctOption: {correct_option}"
     
     # Validate options
     options = question.get('options', [])
     if len(options) != 4:
-        errors.append(f"Expected 4 options, got {len(options)}")
+        yield f"Expected 4 options, got {len(options)}"
     else:
-        # Check each option
         option_ids = [opt.get('id') for opt in options]
-        if set(option_ids) != {'A', 'B', 'C', 'D'}:
-            errors.append(f"Invalid option IDs: {option_ids}")
-        
-        # Check for placeholder text in options
-        for opt in options:
-            opt_text = opt.get('text', '').lower()
-            if 'text here' in opt_text or 'option' in opt_text and 'text' in opt_text:
-                errors.append(f"Placeholder found in option {opt.get('id')}")
-                break
+        if set(option_ids) != _OPTION_IDS:
+            yield f"Invalid option IDs: {option_ids}"
     
-    # Validate correct option
-    correct_option = question.get('correctOption')
-    if correct_option not in ['A', 'B', 'C', 'D']:
-        errors.append(f"Invalid correctOption: {correct_option}")
+    # Validate question text
+    question_text = question.get('questionText', '')
+    if len(question_text) < 50:
+        yield f"Question text too short: {len(question_text)} chars"
+    
+    # Validate step by step solution
+    steps = question.get('stepByStep', [])
+    if not steps:
+        yield "Missing stepByStep solution"
+    elif len(steps) < 2:
+        yield f"Solution too brief: {len(steps)} steps"
     
     # Validate classification
     classification = question.get('classification', {})
     
     chapter = classification.get('chapter', '')
     if not chapter or chapter.lower() in ['unknown', 'chapter name here']:
-        errors.append("Chapter is missing or placeholder")
+        yield "Chapter is missing or placeholder"
     
     topic = classification.get('topic', '')
     if not topic or topic.lower() in ['unknown', 'topic name here']:
-        errors.append("Topic is missing or placeholder")
+        yield "Topic is missing or placeholder"
     
     concept_tags = classification.get('conceptTags', [])
     if not concept_tags or len(concept_tags) < 2:
-        errors.append(f"Insufficient concept tags: {len(concept_tags)}")
+        yield f"Insufficient concept tags: {len(concept_tags)}"
     elif any('concept' in str(tag).lower() and not tag.lower().startswith('concept') 
              for tag in concept_tags):
-        errors.append("Placeholder concepts found")
+        yield "Placeholder concepts found"
     
-    # Validate step by step solution
-    steps = question.get('stepByStep', [])
-    if not steps:
-        errors.append("Missing stepByStep solution")
-    elif len(steps) < 2:
-        errors.append(f"Solution too brief: {len(steps)} steps")
+    # Check for placeholder text in options
+    if len(options) == 4:
+        for opt in options:
+            opt_text = opt.get('text', '').lower()
+            if 'text here' in opt_text or 'option' in opt_text and 'text' in opt_text:
+                yield f"Placeholder found in option {opt.get('id')}"
+                break
+    
+    # Check for placeholder content
+    if PLACEHOLDER_RE.search(question_text):
+        # Only on a hit, find which pattern to report (first in list order)
+        pattern = next(p for p in PLACEHOLDER_PATTERNS if p.search(question_text))
+        yield f"Found placeholder pattern: {pattern.pattern}"
+
+
+def validate_question_completeness(question: dict, fast_fail: bool = False) -> Tuple[bool, List[str]]:
+    """
+    Validate that a structured question contains complete and valid data.
+    
+    Args:
+        question: Structured question dictionary
+        fast_fail: Stop at the first error instead of collecting all of them
+        
+    Returns:
+        Tuple of (is_valid: bool, error_reasons: List[str])
+    """
+    errors = _iter_errors(question)
+    if fast_fail:
+        first = next(errors, None)
+        return first is None, [] if first is None else [first]
     
+    errors = list(errors)
     return len(errors) == 0, errors
 
 
@@ -153,7 +168,8 @@ def get_validation_summary(questions: List[dict]) -> dict:
     }
     
     for q in questions:
-        is_valid, errors = validate_question_completeness(q)
+        # Full breakdown wanted here, so every error is collected
+        is_valid, errors = validate_question_completeness(q, fast_fail=False)
         if is_valid:
             summary['valid'] += 1
         else:
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Rate limiting module for pacing API requests across worker threads.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Iterator, Mapping, Optional
+
+
+logger = logging.getLogger(__name__)
+
+# Anthropic rate-limit headers: remaining quota and when it resets (RFC 3339)
+_LIMIT_HEADERS = (
+    ('anthropic-ratelimit-requests-remaining', 'anthropic-ratelimit-requests-reset'),
+    ('anthropic-ratelimit-tokens-remaining', 'anthropic-ratelimit-tokens-reset'),
+)
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket shared by all API worker threads.
+
+    Allows bursts of up to `burst` requests and refills at `rate` requests
+    per second, so idle time earns credit instead of being slept away.
+    Server rate-limit headers can pause the bucket until the quota resets.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        """
+        Args:
+            rate: Sustained requests per second (0 for no limit)
+            burst: Maximum requests allowed back-to-back
+        """
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_delay(cls, delay: float, burst: int = 1) -> 'RateLimiter':
+        """Build a limiter averaging one request every `delay` seconds."""
+        return cls(1.0 / delay if delay > 0 else 0.0, burst)
+
+    def acquire(self) -> None:
+        """Block until a request may be sent."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                elif self.rate <= 0:
+                    return
+                else:
+                    elapsed = now - self._updated
+                    self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+                    self._updated = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def pause_for(self, seconds: float) -> None:
+        """Hold every caller for `seconds`, then resume with an empty bucket."""
+        if seconds <= 0:
+            return
+
+        with self._lock:
+            resume_at = time.monotonic() + seconds
+            if resume_at > self._paused_until:
+                self._paused_until = resume_at
+                # No burst straight after a pause - that is what tripped the limit
+                self._tokens = 0.0
+                self._updated = resume_at
+        logger.info("⏸️  Rate limit reached, pausing requests for %.1fs", seconds)
+
+    def update_from_headers(self, headers: Mapping[str, str]) -> None:
+        """
+        Pause until reset when the server reports an exhausted quota.
+
+        Args:
+            headers: Response headers (case-insensitive mapping)
+        """
+        for remaining_key, reset_key in _LIMIT_HEADERS:
+            remaining = headers.get(remaining_key)
+            if remaining is None or remaining.strip() != '0':
+                continue
+
+            wait = _seconds_until(headers.get(reset_key))
+            if wait is not None:
+                self.pause_for(wait)
+
+
+class SlidingWindowLimiter:
+    """
+    Per-minute request and token budgets over a sliding window.
+    
+    Each send is recorded with its token estimate, and a new one waits
+    until the sends of the last `window` seconds leave room for it, so
+    the provider's limits are respected before it has to reject anything.
+    """
+    
+    def __init__(self, requests_per_minute: float, tokens_per_minute: int = 0, window: float = 60.0):
+        """
+        Args:
+            requests_per_minute: Requests allowed per window (0 for no limit)
+            tokens_per_minute: Tokens allowed per window (0 for no limit)
+            window: Window length in seconds
+        """
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.window = window
+        self._sent = deque()  # (monotonic time, tokens) per request
+        self._tokens = 0
+        self._lock = threading.Lock()
+    
+    def acquire(self, tokens: int = 0) -> None:
+        """Block until a request of `tokens` estimated tokens fits both budgets."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                while self._sent and self._sent[0][0] <= now - self.window:
+                    self._tokens -= self._sent.popleft()[1]
+                
+                fits_requests = self.requests_per_minute <= 0 or len(self._sent) < self.requests_per_minute
+                # A request larger than the whole budget still goes once the window is empty
+                fits_tokens = (self.tokens_per_minute <= 0 or not self._sent
+                               or self._tokens + tokens <= self.tokens_per_minute)
+                if fits_requests and fits_tokens:
+                    self._sent.append((now, tokens))
+                    self._tokens += tokens
+                    return
+                wait = self._sent[0][0] + self.window - now
+            time.sleep(wait)
+
+
+class AdaptiveConcurrency:
+    """
+    AIMD cap on the number of requests in flight across worker threads.
+    
+    The cap grows additively while the mean latency of recent calls stays
+    within the target, and is cut multiplicatively whenever the server
+    throttles or fails, so throughput settles just under what the API
+    sustains without manual tuning.
+    """
+    
+    def __init__(
+        self,
+        maximum: int,
+        minimum: int = 1,
+        increase: float = 0.5,
+        decrease: float = 0.5,
+        target_latency: float = 8.0,
+        window: int = 20
+    ):
+        """
+        Args:
+            maximum: Highest cap, and the starting one
+            minimum: Lowest cap after repeated cuts
+            increase: Added to the cap after each fast enough call
+            decrease: Factor applied to the cap on throttling or failure
+            target_latency: Mean latency in seconds that still counts as healthy
+            window: Number of recent latencies averaged
+        """
+        self.maximum = max(1, maximum)
+        self.minimum = max(1, min(minimum, self.maximum))
+        self.increase = increase
+        self.decrease = decrease
+        self.target_latency = target_latency
+        self._limit = float(self.maximum)
+        self._in_flight = 0
+        self._latencies = deque(maxlen=window)
+        self._cond = threading.Condition()
+    
+    @property
+    def limit(self) -> int:
+        """Current number of requests allowed in flight."""
+        return int(self._limit)
+    
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """Hold one in-flight slot for the duration of a request."""
+        with self._cond:
+            while self._in_flight >= int(self._limit):
+                self._cond.wait()
+            self._in_flight += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._in_flight -= 1
+                self._cond.notify_all()
+    
+    def record(self, latency: float, overloaded: bool = False) -> None:
+        """
+        Adjust the cap after a request.
+        
+        Args:
+            latency: Seconds the request took
+            overloaded: True on 429/5xx responses and connection failures
+        """
+        with self._cond:
+            previous = int(self._limit)
+            if overloaded:
+                self._limit = max(self.minimum, self._limit * self.decrease)
+                # Latencies from before the cut no longer describe the load
+                self._latencies.clear()
+            else:
+                self._latencies.append(latency)
+                if sum(self._latencies) / len(self._latencies) <= self.target_latency:
+                    self._limit = min(self.maximum, self._limit + self.increase)
+            
+            if int(self._limit) != previous:
+                logger.debug("Concurrency limit %d -> %d", previous, int(self._limit))
+                self._cond.notify_all()
+
+
+def _seconds_until(timestamp: Optional[str]) -> Optional[float]:
+    """Seconds from now until an RFC 3339 timestamp, or None if unparseable."""
+    if not timestamp:
+        return None
+
+    try:
+        reset_at = datetime.fromisoformat(timestamp)
+    except ValueError:
+        return None
+
+    if reset_at.tzinfo is None:
+        reset_at = reset_at.replace(tzinfo=timezone.utc)
+    return (reset_at - datetime.now(timezone.utc)).total_seconds()
+
+
+def retry_after_seconds(headers: Mapping[str, str], default: float) -> float:
+    """
+    Read the retry-after header of a 429 response.
+
+    Args:
+        headers: Response headers (case-insensitive mapping)
+        default: Delay to use when the header is missing or malformed
+
+    Returns:
+        Seconds to wait before retrying
+    """
+    try:
+        return float(headers.get('retry-after', default))
+    except (TypeError, ValueError):
+        return default
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Persistent cache of structured API responses, so reruns skip paid calls.
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Optional
+
+import orjson
+
+
+class ResponseCache:
+    """
+    SQLite-backed store of structured results keyed by request hash.
+
+    Values are zlib-compressed JSON. One connection is shared by all
+    worker threads, guarded by a lock.
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS llm_cache ('
+            'key TEXT PRIMARY KEY, value BLOB NOT NULL, ts INTEGER NOT NULL)'
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def key_for(request: dict) -> str:
+        """
+        Hash a request payload into a cache key.
+
+        The whole payload is hashed - model, prompts and sampling settings -
+        so changing any of them misses the cache instead of serving stale output.
+        """
+        blob = orjson.dumps(request, option=orjson.OPT_SORT_KEYS)
+        return hashlib.sha256(blob).hexdigest()
+
+    def get(self, key: str) -> Optional[dict]:
+        """Return the cached result for key, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT value FROM llm_cache WHERE key = ?', (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return orjson.loads(zlib.decompress(row[0]))
+
+    def put(self, key: str, value: dict) -> None:
+        """Store a result under key, replacing any earlier entry."""
+        blob = zlib.compress(orjson.dumps(value))
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO llm_cache (key, value, ts) VALUES (?, ?, ?)',
+                (key, blob, int(time.time()))
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self) -> 'ResponseCache':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
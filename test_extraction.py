@@ -3,46 +3,74 @@
 Test script to manually extract Q1-5 with correct answers from PDF.
 """
 
-import fitz
 import re
-import json
+from itertools import islice
+
+import fitz
+import orjson
+
+from pdf_extractor import extract_pages_range
+
+# Question header "NUMBER." ending its line, and the "Answer (X)" line that
+# closes the question after options (1)-(4)
+HEADER_PATTERN = re.compile(r'(\d+)\.\s*\n')
+ANSWER_PATTERN = re.compile(r'Answer\s*\((\d)\)')
+OPTION_MARKERS = ('(1)', '(2)', '(3)', '(4)')
+
+
+def iter_question_blocks(text):
+    """
+    Yield (number, question text, option 1-4 texts, answer digit) per question.
+    
+    A single left-to-right pass: after each header, the next (1), (2), (3),
+    (4) and Answer are found in turn, each search starting where the last
+    ended. This finds the same blocks as one DOTALL regex with lazy groups
+    between them, without that regex's backtracking on pages where a
+    question is never closed. If a question is not closed, no later one
+    can be either, so the scan stops there.
+    """
+    pos = 0
+    while True:
+        header = HEADER_PATTERN.search(text, pos)
+        if header is None:
+            return
+        
+        parts = []
+        start = header.end()
+        for marker in OPTION_MARKERS:
+            found = text.find(marker, start)
+            if found == -1:
+                return
+            parts.append(text[start:found])
+            start = found + len(marker)
+        
+        answer = ANSWER_PATTERN.search(text, start)
+        if answer is None:
+            return
+        parts.append(text[start:answer.start()])
+        
+        yield (header.group(1), *parts, answer.group(1))
+        pos = answer.end()
+
 
 # Open PDF
 pdf = fitz.open('/home/harish/Desktop/neet-learning-platform/NEET_2024_Physics.pdf')
-text = pdf[1].get_text()  # Page 2 has questions 1-4
-text2 = pdf[2].get_text()  # Page 3 has more questions
-full_text = text + "\n" + text2
+# Page 2 has questions 1-4, page 3 has more questions. Pages are read by
+# the same helper as the extractor, which uses worker processes for long ranges.
+full_text = "\n".join(extract_pages_range(pdf, 1, 3))
 
-# Manual extraction with better regex
+# Manual extraction, one pass over the text
 questions = []
 
-# Pattern to match: "NUMBER. QUESTION_TEXT (1) OPT1 (2) OPT2 (3) OPT3 (4) OPT4 Answer (X)"
-pattern = re.compile(
-    r'(\d+)\.\s*\n'  # Question number with newline
-    r'(.*?)'  # Question text (non-greedy)
-    r'\(1\)\s*(.*?)'  # Option 1
-    r'\(2\)\s*(.*?)'  # Option 2  
-    r'\(3\)\s*(.*?)'  # Option 3
-    r'\(4\)\s*(.*?)'  # Option 4
-    r'Answer\s*\((\d)\)',  # Answer
-    re.DOTALL
-)
+# Map to letters
+NUM_TO_LETTER = {'1': 'A', '2': 'B', '3': 'C', '4': 'D'}
 
-matches = pattern.findall(full_text)
-
-for match in matches:
-    q_num, q_text, opt1, opt2, opt3, opt4, answer_idx = match
-    
+# Only the first 5 questions are needed, so stop scanning after them
+for q_num, *texts, answer_idx in islice(iter_question_blocks(full_text), 5):
     # Clean up texts
-    q_text = ' '.join(q_text.split())
-    opt1 = ' '.join(opt1.split())
-    opt2 = ' '.join(opt2.split())
-    opt3 = ' '.join(opt3.split())
-    opt4 = ' '.join(opt4.split())
+    q_text, opt1, opt2, opt3, opt4 = (' '.join(part.split()) for part in texts)
     
-    # Map to letters
-    num_to_letter = {'1': 'A', '2': 'B', '3': 'C', '4': 'D'}
-    correct_letter = num_to_letter[answer_idx]
+    correct_letter = NUM_TO_LETTER[answer_idx]
     
     question_dict = {
         'number': int(q_num),
@@ -58,9 +86,6 @@ for match in matches:
     }
     
     questions.append(question_dict)
-    
-    if len(questions) >= 5:
-        break
 
 # Print results
 print(f"Extracted {len(questions)} questions\n")
@@ -75,7 +100,7 @@ output = {
     'questions': questions
 }
 
-with open('test_q1_5.json', 'w') as f:
-    json.dump(output, f, indent=2)
+with open('test_q1_5.json', 'wb') as f:
+    f.write(orjson.dumps(output, option=orjson.OPT_INDENT_2))
 
 print(f"Saved to test_q1_5.json")